@@ -1,10 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, users, posts, roles
+from app.api.routes import auth, monitoring, users, posts, roles, search
 
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["login"])
 api_router.include_router(users.router, prefix="/user", tags=["user"])
 api_router.include_router(posts.router, prefix="/post", tags=["post"])
-api_router.include_router(roles.router, prefix="/role", tags=["role"])
\ No newline at end of file
+api_router.include_router(roles.router, prefix="/role", tags=["role"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
\ No newline at end of file
@@ -1,3 +1,4 @@
+import logging
 from typing import Annotated
 
 import jwt
@@ -5,11 +6,14 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.session import AsyncSessionLocal
-from app.schemas.common_schema import TokenPayload
+from app.core.principal_cache import cache_principal, get_cached_principal
+from app.core.revocation import REVOKED, token_revocations
+from app.core.session import AsyncReadSessionLocal, AsyncSessionLocal
+from app.schemas.common_schema import Principal, TokenPayload
 from app.models.user_model import User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -17,34 +21,88 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-async def get_async_session():   
-   async with AsyncSessionLocal() as session:
-        async with session.begin():
-            yield session
-            session.expunge_all()
+async def get_async_session():
+    """
+    Session for the request. Routes commit their own writes and may keep
+    reading after a commit, which starts a new transaction; anything left
+    uncommitted is rolled back when the session closes.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+        session.expunge_all()
+
+
+async def get_async_read_session():
+    """
+    Session for read-only endpoints, bound to the replica when one is
+    configured. Falls back to the primary if the replica can't be reached.
+    Replicas may lag, so don't use it where the caller must see its own writes.
+    """
+    session = None
+    if AsyncReadSessionLocal:
+        session = AsyncReadSessionLocal()
+        try:
+            await session.connection()
+        except (DBAPIError, OSError):
+            logging.warning("Read replica unavailable, falling back to primary")
+            await session.close()
+            session = None
+    if session is None:
+        session = AsyncSessionLocal()
+    async with session:
+        yield session
+        session.expunge_all()
 
 
 SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_session)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-async def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def decode_access_token(token: str) -> TokenPayload:
     try:
         payload = jwt.decode(
             token, 
             settings.ENCRYPT_KEY, 
             algorithms=[settings.JWT_ALGORITHM]
         )
-        token_data = TokenPayload(**payload)
+        return TokenPayload(**payload)
     except (InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )    
-    user = await session.get(User, token_data.sub)
+
+
+def token_revoked() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked"
+    )
+
+
+async def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    token_data = decode_access_token(token)
+    return await load_token_user(session, token_data)
+
+
+async def load_token_user(session: AsyncSession, token_data: TokenPayload) -> User:
+    # The cached instance stays detached and unmodified; each request works on
+    # its own session-bound copy produced by merge(load=False), without SQL.
+    cached_user = get_cached_principal(token_data.sub)
+    if cached_user:
+        user = await session.merge(cached_user, load=False)
+    else:
+        user = await session.get(User, token_data.sub)
+        if user:
+            session.expunge(user)
+            cache_principal(user)
+            token_revocations.set(user.id, user.token_version if user.is_active else REVOKED)
+            user = await session.merge(user, load=False)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if token_data.ver is not None and token_data.ver != user.token_version:
+        raise token_revoked()
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
@@ -53,9 +111,43 @@ async def get_current_user(session: SessionDep, token: TokenDep) -> User:
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-def get_current_active_superuser(current_user: CurrentUser) -> User: 
-    if not current_user.is_superuser:
+async def get_current_principal(session: SessionDep, token: TokenDep) -> Principal:
+    """
+    The caller's permissions without loading the user where possible.
+
+    With STATELESS_AUTH, a token whose version matches the one this worker
+    knows for its subject is trusted as is. Otherwise, including the first
+    request of a user on this worker, the user row is checked.
+    """
+    token_data = decode_access_token(token)
+    if settings.STATELESS_AUTH and token_data.ver is not None:
+        version = token_revocations.get(token_data.sub)
+        if version is not None:
+            if version != token_data.ver:
+                raise token_revoked()
+            if not token_data.act:
+                raise HTTPException(status_code=400, detail="Inactive user")
+            return Principal(
+                id=token_data.sub, 
+                is_active=True, 
+                is_superuser=bool(token_data.su), 
+                roles=token_data.roles,
+            )
+    user = await load_token_user(session, token_data)
+    return Principal(
+        id=user.id, 
+        is_active=user.is_active, 
+        is_superuser=user.is_superuser, 
+        roles=token_data.roles,
+    )
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+
+
+def get_current_active_superuser(principal: CurrentPrincipal) -> Principal: 
+    if not principal.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
-    return current_user
\ No newline at end of file
+    return principal
\ No newline at end of file
@@ -4,15 +4,16 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.crud.user_crud import authenticate, get_user_by_email
+from app.crud.user_crud import authenticate, get_token_claims, get_user_by_email
 from app.api.deps import SessionDep
 from app.core.config import settings
-from app.core.security import get_password_hash, create_access_token
+from app.core.mail import enqueue_email
+from app.core.principal_cache import invalidate_principal
+from app.core.security import hash_password_async, create_access_token
 from app.schemas.common_schema import Token, Message, NewPassword
 from app.utils import (
     generate_password_reset_token,
     generate_reset_password_email,
-    send_email,
     verify_password_reset_token,
 )
 
@@ -34,9 +35,12 @@ async def login_access_token(
     elif not user.email:
         raise HTTPException(status_code=400, detail="Inactive user")
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = None
+    if settings.STATELESS_AUTH:
+        claims = await get_token_claims(session=session, user=user)
     return Token(
         access_token=create_access_token(
-            user.id, expires_delta=access_token_expires
+            user.id, expires_delta=access_token_expires, claims=claims
         )
     )
 
@@ -57,7 +61,7 @@ async def recover_password(email: str, session: SessionDep) -> Message:
     email_data = generate_reset_password_email(
         email_to=user.email, email=email, token=password_reset_token
     )
-    send_email(
+    await enqueue_email(
         email_to=user.email,
         subject=email_data.subject,
         html_content=email_data.html_content,
@@ -81,8 +85,9 @@ async def reset_password(session: SessionDep, body: NewPassword) -> Message:
         )
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    hashed_password = get_password_hash(password=body.new_password)
+    hashed_password = await hash_password_async(body.new_password)
     user.hashed_password = hashed_password
     session.add(user)
     await session.commit()
+    invalidate_principal(user.id)
     return Message(message="Password updated successfully")
\ No newline at end of file
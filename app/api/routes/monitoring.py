@@ -0,0 +1,35 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_active_superuser
+from app.core.middleware import get_route_stats
+from app.core.session import get_pool_stats
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/pool",
+    summary="Get database pool stats",
+    dependencies=[Depends(get_current_active_superuser)]
+)
+async def read_pool_stats() -> Any:
+    """
+    Get connection pool usage and checkout wait times.
+    """
+    return get_pool_stats()
+
+
+@router.get(
+    "/routes",
+    summary="Get per-route SQL stats",
+    dependencies=[Depends(get_current_active_superuser)]
+)
+async def read_route_stats() -> Any:
+    """
+    Get request duration, query count, DB time, pool wait and the slowest
+    statement for each route since startup.
+    """
+    return get_route_stats()
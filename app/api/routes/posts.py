@@ -1,134 +1,295 @@
 import uuid
-from typing import Annotated, Any
+from typing import Annotated, Any, Awaitable, Callable
 
-from app.crud.post_crud import get_post_by_title, post_create
+from app.crud.post_crud import post_create
 
-from fastapi import APIRouter, Form, HTTPException, UploadFile
-from sqlmodel import func, select
+from fastapi import (
+    APIRouter, 
+    BackgroundTasks, 
+    Form, 
+    HTTPException, 
+    Query, 
+    Request, 
+    Response, 
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import CurrentUser, ReadSessionDep, SessionDep
+from app.core.bulk import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, read_records
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.http_cache import cache_headers, etag_matches, make_etag, not_modified
+from app.core.serialization import fast_json_response, list_response
+from app.core.pagination import count_rows, encode_cursor, next_cursor, paginate
+from app.core.session import AsyncSessionLocal
 from app.models.post_model import Post
-from app.models.tag_model import Tag
-from app.schemas.post_schema import PostsPublic, PostPublic, PostUpdate
-from app.schemas.common_schema import Message
+from app.models.tag_model import PostTag, Tag
+from app.schemas.post_schema import (
+    BulkImportResult,
+    PostsPublic, 
+    PostsSummary,
+    PostPublic, 
+    PostSearchHit,
+    PostSearchResults,
+    PostUpdate,
+)
+from app.schemas.common_schema import BulkFormat, CountMode, Message
 from app.crud import user_crud, post_crud
 
 router = APIRouter()
 
+# The cached first page of /author/{nickname}; other pages are read through.
+AUTHOR_PAGE_SIZE = 100
 
-@router.get("/all", response_model=PostsPublic)
+
+@router.get("/all", response_model=PostsPublic | PostsSummary)
 async def read_posts(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: ReadSessionDep, 
+    current_user: CurrentUser, 
+    skip: int = 0, 
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE), 
+    cursor: str | None = None,
+    count_mode: CountMode = Query(CountMode.exact, alias="count"),
+    summary: bool = False,
+    stream: bool = False,
 ) -> Any:
     """
     Retrieve posts.
+
+    Pass the returned `next_cursor` as `cursor` to page by keyset instead of offset.
+    With `summary=true` the post `content` is left out. With `stream=true`
+    every post from `cursor` or `skip` on is streamed as NDJSON, one post per
+    line, and `limit` and `count` are ignored.
     """
-    
-    if current_user.is_superuser:        
-        count_statement = select(func.count()).select_from(Post)        
-        count = await session.scalar(count_statement)        
-        statement = select(Post).offset(skip).limit(limit)
-        posts = await session.scalars(statement)
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Post)
-            .where(Post.status == True)
-        )
-        count = await session.scalar(count_statement)
-        statement = (
-            select(Post)
-            .where(Post.status == True)
-            .offset(skip)
-            .limit(limit)
+    filters = [] if current_user.is_superuser else [Post.status == True]
+    if stream:
+        statement = post_crud.select_post_rows(summary=summary).where(*filters)
+        statement = paginate(statement, Post, skip=skip, limit=None, cursor=cursor)
+        return StreamingResponse(
+            post_crud.stream_post_rows(statement=statement, summary=summary),
+            media_type=NDJSON_MEDIA_TYPE,
         )
-        posts = await session.scalars(statement)
-    # print(f'AAAAAAAAAAAAAAAAAAAAAAAA {posts.all()}')
-    return PostsPublic(data=posts, count=count)
+    count = await count_rows(session, Post, *filters, mode=count_mode)
+    statement = post_crud.select_post_rows(summary=summary).where(*filters)
+    statement = paginate(statement, Post, skip=skip, limit=limit, cursor=cursor)
+    rows, posts = await post_crud.read_post_rows(session=session, statement=statement)
+    schema = PostsSummary if summary else PostsPublic
+    return list_response(schema, data=posts, count=count, next_cursor=next_cursor(rows, limit))
 
 
-@router.get("/self", response_model=PostsPublic)
+@router.get("/self", response_model=PostsPublic | PostsSummary)
 async def read_self_posts(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep, 
+    current_user: CurrentUser, 
+    skip: int = 0, 
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE), 
+    cursor: str | None = None,
+    count_mode: CountMode = Query(CountMode.exact, alias="count"),
+    summary: bool = False,
 ) -> Any:
     """
     Retrieve posts.
+
+    Pass the returned `next_cursor` as `cursor` to page by keyset instead of offset.
+    With `summary=true` the post `content` is left out.
     """
-    
-    if current_user.is_superuser:        
-        count_statement = select(func.count()).select_from(Post)        
-        count = await session.scalar(count_statement)        
-        statement = select(Post).offset(skip).limit(limit)
-        posts = await session.scalars(statement)
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Post)
-            .where(Post.author_id == current_user.id)
-        )
-        count = await session.scalar(count_statement)
-        statement = (
-            select(Post)
-            .where(Post.author_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
-        )
-        posts = await session.scalars(statement)
+    filters = [] if current_user.is_superuser else [Post.author_id == current_user.id]
+    count = await count_rows(session, Post, *filters, mode=count_mode)
+    statement = post_crud.select_post_rows(summary=summary).where(*filters)
+    statement = paginate(statement, Post, skip=skip, limit=limit, cursor=cursor)
+    rows, posts = await post_crud.read_post_rows(session=session, statement=statement)
+    schema = PostsSummary if summary else PostsPublic
+    return list_response(schema, data=posts, count=count, next_cursor=next_cursor(rows, limit))
 
-    return PostsPublic(data=posts, count=count)
+
+@router.get("/search", response_model=PostSearchResults)
+async def search_posts(
+    session: ReadSessionDep, 
+    current_user: CurrentUser, 
+    q: str = Query(min_length=1, max_length=200), 
+    limit: int = Query(20, ge=1, le=100), 
+    cursor: str | None = None,
+) -> Any:
+    """
+    Full-text search over published posts, best matches first.
+
+    Snippets are HTML-escaped text with matches in `<mark>`. Pass the returned `next_cursor`
+    as `cursor` to get the next page.
+    """
+    rows = await post_crud.search_posts(session=session, query=q, limit=limit, cursor=cursor)
+    hits = [
+        PostSearchHit.model_validate(post, update={"rank": rank, "snippet": snippet})
+        for post, rank, snippet in rows
+    ]
+    next_page = encode_cursor(hits[-1].rank, hits[-1].id) if len(hits) == limit else None
+    return PostSearchResults(data=hits, next_cursor=next_page)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_posts(current_user: CurrentUser, format: BulkFormat = BulkFormat.ndjson) -> Any:
+    """
+    Stream posts with their tags as NDJSON or CSV, your own or all for superusers.
+    """
+    filters = [] if current_user.is_superuser else [Post.author_id == current_user.id]
+    media_type = CSV_MEDIA_TYPE if format == BulkFormat.csv else NDJSON_MEDIA_TYPE
+    return StreamingResponse(
+        post_crud.export_posts(statement=post_crud.select_export_rows(*filters), format=format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="posts.{format.value}"'},
+    )
+
+
+def _from_primary(load: Callable[[Any], Awaitable[dict | None]]) -> Callable[[], Awaitable[dict | None]]:
+    """
+    Run a cache loader on the primary: an entry read from a lagging replica
+    would be served stale until it expires, long after the replica caught up.
+    """
+    async def loader() -> dict | None:
+        async with AsyncSessionLocal() as session:
+            return await load(session)
+    return loader
+
+
+def _post_cache_entry(post: Post) -> dict:
+    return {
+        "etag": make_etag("post", post.id, post.updated_at, post.author.updated_at),
+        "author_id": str(post.author_id),
+        "data": PostPublic.model_validate(post).model_dump(mode="json"),
+    }
 
 
 @router.get("/{id}", response_model=PostPublic)
-async def read_post(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+async def read_post(
+    request: Request, 
+    response: Response, 
+    current_user: CurrentUser, 
+    id: uuid.UUID,
+) -> Any:
     """
     Get post by ID.
     """
-    post = await session.get(Post, id)
-    if not post:
+    async def load(session) -> dict | None:
+        post = await post_crud.get_post(session=session, post_id=id)
+        return _post_cache_entry(post) if post else None
+
+    entry = await cache.get_or_load(f"post:id:{id}", _from_primary(load))
+    if not entry:
         raise HTTPException(status_code=404, detail="Post not found")
-    if not current_user.is_superuser and (post.author_id != current_user.id):
+    if not current_user.is_superuser and (entry["author_id"] != str(current_user.id)):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    return post
+    etag = entry["etag"]
+    if etag_matches(request, etag):
+        return not_modified(etag, settings.POST_CACHE_CONTROL)
+    response.headers.update(cache_headers(etag, settings.POST_CACHE_CONTROL))
+    return entry["data"]
 
 
 @router.get("/slug/{slug}", response_model=PostPublic)
-async def read_post_by_slug(session: SessionDep, current_user: CurrentUser, slug: str) -> Any:
+async def read_post_by_slug(
+    request: Request, 
+    response: Response, 
+    current_user: CurrentUser, 
+    slug: str,
+) -> Any:
     """
     Get post by slug.
     """
-    statement = select(Post).where(Post.slug == slug).where(Post.status == True)
-    post = await session.scalar(statement)
-    if not post:
+    async def load(session) -> dict | None:
+        statement = (
+            select(Post)
+            .where(Post.slug == slug)
+            .where(Post.status == True)
+            .options(*post_crud.POST_PUBLIC_OPTIONS)
+        )
+        post = await session.scalar(statement)
+        return _post_cache_entry(post) if post else None
+
+    entry = await cache.get_or_load(f"post:slug:{slug}", _from_primary(load))
+    if not entry:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    etag = entry["etag"]
+    if etag_matches(request, etag):
+        return not_modified(etag, settings.PUBLISHED_POST_CACHE_CONTROL)
+    response.headers.update(cache_headers(etag, settings.PUBLISHED_POST_CACHE_CONTROL))
+    return entry["data"]
 
 
 @router.get("/author/{nickname}", response_model=PostsPublic)
-async def read_posts_by_author(session: SessionDep, current_user: CurrentUser, nickname: str) -> Any:
+async def read_posts_by_author(
+    request: Request, 
+    response: Response, 
+    session: ReadSessionDep, 
+    current_user: CurrentUser, 
+    nickname: str, 
+    skip: int = 0, 
+    limit: int = Query(AUTHOR_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE), 
+    cursor: str | None = None,
+    count_mode: CountMode = Query(CountMode.exact, alias="count"),
+    stream: bool = False,
+) -> Any:
     """
     Get posts by author.
+
+    Pass the returned `next_cursor` as `cursor` to page by keyset instead of offset.
+    Only the first page at the default `limit` is cached. With `stream=true`
+    every post from `cursor` or `skip` on is streamed as NDJSON, one post per
+    line, without `count`, caching or validators, and `limit` is ignored.
     """    
-    author = await user_crud.get_user_by_nickname(session=session, nickname=nickname)    
-    if author:
-        statement = select(Post).where(Post.status == True).filter(Post.author_id == author.id)
-        posts = await session.scalars(statement)
-        if not posts:
-            raise HTTPException(status_code=404, detail="Post not found")
-        count_statement = (
-            select(func.count())
-            .select_from(Post)
-            .where(Post.status == True)
-            .filter(Post.author_id == author.id)
+    if stream:
+        author = await user_crud.get_user_by_nickname(session=session, nickname=nickname)
+        if not author:
+            raise HTTPException(status_code=404, detail=f'{nickname} posts not found')
+        statement = post_crud.select_post_rows().where(Post.status == True, Post.author_id == author.id)
+        statement = paginate(statement, Post, skip=skip, limit=None, cursor=cursor)
+        return StreamingResponse(
+            post_crud.stream_post_rows(statement=statement), media_type=NDJSON_MEDIA_TYPE
+        )
+
+    async def load(session) -> dict | None:
+        author = await user_crud.get_user_by_nickname(session=session, nickname=nickname)    
+        if not author:
+            return None
+        filters = [Post.status == True, Post.author_id == author.id]
+        statement = post_crud.select_post_rows().where(*filters)
+        statement = paginate(statement, Post, skip=skip, limit=limit, cursor=cursor)
+        rows, posts = await post_crud.read_post_rows(session=session, statement=statement)
+        count = await count_rows(session, Post, *filters, mode=count_mode)
+        last_updated = max((post["updated_at"] for post in posts), default=None)
+        etag = make_etag(
+            "author", author.id, author.updated_at, skip, cursor, limit, count, last_updated,
+            count_mode.value, *(post["id"] for post in posts),
+        )
+        return {
+            "etag": etag,
+            "data": PostsPublic(
+                data=posts, count=count, next_cursor=next_cursor(rows, limit)
+            ).model_dump(mode="json"),
+        }
+
+    if skip == 0 and cursor is None and limit == AUTHOR_PAGE_SIZE:
+        entry = await cache.get_or_load(
+            f"post:author:{nickname}:{count_mode.value}", _from_primary(load)
         )
-        count = await session.scalar(count_statement)
-        return PostsPublic(data=posts.all(), count=count)
     else:
+        entry = await load(session)
+    if not entry:
         raise HTTPException(status_code=404, detail=f'{nickname} posts not found')
+    etag = entry["etag"]
+    if etag_matches(request, etag):
+        return not_modified(etag, settings.PUBLISHED_POST_CACHE_CONTROL)
+    headers = cache_headers(etag, settings.PUBLISHED_POST_CACHE_CONTROL)
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json_response(PostsPublic, entry["data"], headers)
+    response.headers.update(headers)
+    return entry["data"]
 
 
 @router.post("/", response_model=PostPublic)
 async def create_post(
     *, session: SessionDep, 
+    background_tasks: BackgroundTasks,
     current_user: CurrentUser, 
     title: Annotated[str, Form()], 
     description: Annotated[str, Form()],
@@ -138,13 +299,13 @@ async def create_post(
 ) -> Any:
     """
     Create new post.
+
+    The poster is resized after the response is sent; `poster_status` stays
+    `pending` until then.
     """
-    db_post = await get_post_by_title(session=session, title=title)
-    if db_post:
-        raise HTTPException(status_code=400, detail="This title is already in use.")
-    
     post = await post_create(
         session=session, 
+        background_tasks=background_tasks,
         current_user=current_user, 
         title=title,
         description=description,
@@ -153,7 +314,36 @@ async def create_post(
         content=content
     )
 
-    return post
+    return await post_crud.get_post(session=session, post_id=post.id)
+
+
+@router.post(
+    "/bulk", 
+    response_model=BulkImportResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}},
+                CSV_MEDIA_TYPE: {"schema": {"type": "string"}},
+            },
+        },
+    },
+)
+async def import_posts(request: Request, current_user: CurrentUser) -> Any:
+    """
+    Import posts from an NDJSON or CSV body, one post per line.
+
+    Records take `title`, `description`, `content`, `tags` (a list, or a
+    comma separated string) and `status`, and are created with you as the
+    author. The body is read as it arrives and inserted in batches; posts
+    whose title is taken and invalid records are skipped and reported.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    records = read_records(request.stream(), media_type)
+    result = await post_crud.import_posts(author=current_user, records=records)
+    await cache.delete(*post_crud.author_cache_keys(current_user.nickname))
+    return result
 
 
 @router.put("/{id}", response_model=PostPublic)
@@ -167,7 +357,7 @@ async def update_post(
     """
     Update an post.
     """
-    post = await session.get(Post, id)
+    post = await post_crud.get_post(session=session, post_id=id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     if not current_user.is_superuser and (post.author_id != current_user.id):
@@ -188,13 +378,38 @@ async def delete_post(
         raise HTTPException(status_code=404, detail="Post not found")
     if not current_user.is_superuser and (post.author_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    cache_keys = await post_crud.post_cache_keys(session=session, post=post)
     await session.delete(post)
     await session.commit()
+    await cache.delete(*cache_keys)
     return Message(message="Post deleted successfully")
 
 
-@router.get("/tag/{tag}")
-async def get_post_by_tag(session: SessionDep, current_user: CurrentUser, tag: str) -> Any:
-    statement = select(Tag).where(Tag.name == tag)
-    posts = await session.scalars(statement)
-    return posts
\ No newline at end of file
+@router.get("/tag/{tag}", response_model=PostsPublic | PostsSummary)
+async def get_post_by_tag(
+    session: ReadSessionDep, 
+    current_user: CurrentUser, 
+    tag: str, 
+    skip: int = 0, 
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE), 
+    cursor: str | None = None,
+    count_mode: CountMode = Query(CountMode.exact, alias="count"),
+    summary: bool = False,
+) -> Any:
+    """
+    Get published posts with a tag.
+
+    With `summary=true` the post `content` is left out.
+    """
+    tagged_posts = (
+        select(PostTag.post_id)
+        .join(Tag, Tag.id == PostTag.tag_id)
+        .where(Tag.name == tag.lower())
+    )
+    filters = [Post.status == True, Post.id.in_(tagged_posts)]
+    count = await count_rows(session, Post, *filters, mode=count_mode)
+    statement = post_crud.select_post_rows(summary=summary).where(*filters)
+    statement = paginate(statement, Post, skip=skip, limit=limit, cursor=cursor)
+    rows, posts = await post_crud.read_post_rows(session=session, statement=statement)
+    schema = PostsSummary if summary else PostsPublic
+    return list_response(schema, data=posts, count=count, next_cursor=next_cursor(rows, limit))
\ No newline at end of file
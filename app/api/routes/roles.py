@@ -6,17 +6,21 @@ from fastapi import (
     APIRouter, 
     File, 
     HTTPException, 
+    Query,
     UploadFile,
 )
 from sqlalchemy import func
 from sqlmodel import select
 from app.api.deps import (
+    ReadSessionDep,
     SessionDep, 
     get_current_active_superuser, 
     CurrentUser
 )
 
 from app.api.deps import get_current_active_superuser
+from app.core.config import settings
+from app.core.pagination import next_cursor, paginate
 from app.models.role_model import Role
 from app.schemas.role_schema import RolesRead, RoleRead
 
@@ -29,11 +33,16 @@ router = APIRouter()
     response_model=RolesRead, 
     dependencies=[Depends(get_current_active_superuser)]
 )
-async def get_roles(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+async def get_roles(
+    session: ReadSessionDep, 
+    skip: int = 0, 
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE), 
+    cursor: str | None = None,
+) -> Any:
     """
     Get all roles.
     """
-    statement = select(Role).offset(skip).limit(limit)
-    roles = await session.scalars(statement)
+    statement = paginate(select(Role), Role, skip=skip, limit=limit, cursor=cursor)
+    roles = (await session.scalars(statement)).all()
 
-    return RolesRead(data=roles)
+    return RolesRead(data=roles, next_cursor=next_cursor(roles, limit))
@@ -0,0 +1,30 @@
+from typing import Any
+
+from fastapi import APIRouter, Query
+
+from app.api.deps import CurrentUser, ReadSessionDep
+from app.crud import search_crud
+from app.schemas.search_schema import Suggestions, SuggestType
+
+
+router = APIRouter()
+
+
+@router.get("/suggest", response_model=Suggestions, summary="Autocomplete suggestions")
+async def suggest(
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    q: str = Query(min_length=1, max_length=100),
+    types: list[SuggestType] = Query(default=list(SuggestType)),
+    limit: int = Query(5, ge=1, le=20),
+) -> Any:
+    """
+    Tags, author nicknames and published post titles starting with `q`.
+    """
+    suggestions = Suggestions()
+    for suggest_type in types:
+        results = await search_crud.get_suggestions(
+            session=session, suggest_type=suggest_type, prefix=q, limit=limit
+        )
+        setattr(suggestions, f"{suggest_type.value}s", results)
+    return suggestions
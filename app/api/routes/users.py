@@ -6,10 +6,14 @@ from fastapi import (
     APIRouter, 
     File, 
     HTTPException, 
+    Query,
     UploadFile,
 )
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import selectinload
 from sqlmodel import col, delete, func, select
-from app.crud import user_crud as crud
+from app.crud import post_crud, user_crud as crud
+from app.core.cache import cache
 from app.core.config import settings
 from app.models.user_model import User
 from app.models.post_model import Post
@@ -22,10 +26,16 @@ from app.schemas.user_schema import (
     UserUpdate,
     RoleRead
 )
-from app.schemas.common_schema import Message
+from app.schemas.common_schema import CountMode, Message
 
 from app.core import security
+from app.core.bulk import NDJSON_MEDIA_TYPE
+from app.core.pagination import count_rows, next_cursor, paginate
+from app.core.principal_cache import invalidate_principal
+from app.core.revocation import REVOKED, token_revocations
+from app.core.serialization import list_response
 from app.api.deps import (
+    ReadSessionDep,
     SessionDep, 
     get_current_active_superuser, 
     CurrentUser
@@ -47,6 +57,7 @@ async def create_user(background_tasks: BackgroundTasks, user_in: UserCreate, se
     if db_user:
         raise HTTPException(status_code=400, detail="Invalid user credentials")
     user = await crud.create_user(session=session, user_create=user_in)
+    user = await crud.load_roles(session=session, user=user)
     print(f'USEEEER SUCCESS CREATE')
     # if settings.EMAILS_ENABLED and user_in.email:
     #     email_data = generate_new_account_email(
@@ -73,36 +84,56 @@ async def update_user(*, session: SessionDep, user_in: UserUpdateSelf, current_u
     #             status_code=409, detail="User with this email already exists"
     #         )
         
+    # Cached posts embed their author.
+    cache_keys = await post_crud.author_post_cache_keys(
+        session=session, author_id=current_user.id, nicknames=[current_user.nickname]
+    )
     user = await crud.update_user(session=session, current_user=current_user, user_in=user_in)
-    return user
+    await cache.delete(*cache_keys)
+    return await crud.load_roles(session=session, user=user)
 
 
 @router.get(
     "/", 
     summary="Get all users", 
-    response_model=list, 
+    response_model=UsersPublic, 
     dependencies=[Depends(get_current_active_superuser)]
 )
-async def get_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+async def get_users(
+    session: ReadSessionDep, 
+    skip: int = 0, 
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE), 
+    cursor: str | None = None,
+    count_mode: CountMode = Query(CountMode.exact, alias="count"),
+    stream: bool = False,
+) -> Any:
     """
     Get all users.
+
+    With `stream=true` every user from `cursor` or `skip` on is streamed as
+    NDJSON, one user per line, and `limit` and `count` are ignored.
     """
+    if stream:
+        statement = paginate(select(User), User, skip=skip, limit=None, cursor=cursor)
+        return StreamingResponse(
+            crud.stream_users(statement=statement), media_type=NDJSON_MEDIA_TYPE
+        )
 
-    count_statement = select(func.count()).select_from(User)
-    count = await session.scalar(count_statement)
+    count = await count_rows(session, User, mode=count_mode)
 
-    statement = select(User).offset(skip).limit(limit)
-    users = await session.exec(statement)
+    statement = select(User).options(selectinload(User.roles))
+    statement = paginate(statement, User, skip=skip, limit=limit, cursor=cursor)
+    users = (await session.exec(statement)).all()
 
-    return UsersPublic(data=users, count=count)
+    return list_response(UsersPublic, data=users, count=count, next_cursor=next_cursor(users, limit))
 
 
 @router.get("/me", response_model=UserPublic, summary="Get current user")
-async def get_user(current_user: CurrentUser) -> Any:
+async def get_user(session: SessionDep, current_user: CurrentUser) -> Any:
     """
     Get current user.
     """    
-    return current_user
+    return await crud.load_roles(session=session, user=current_user)
 
 
 @router.patch("/me/password", response_model=Message, summary="Update user password")
@@ -112,16 +143,17 @@ async def update_user_password(
     """
     Update user password.
     """
-    if not security.verify_password(body.current_password, current_user.hashed_password):
+    if not await security.verify_password_async(body.current_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect password")
     if body.current_password == body.new_password:
         raise HTTPException(
             status_code=400, detail="New password cannot be the same as the current one"
         )
-    hashed_password = security.get_password_hash(body.new_password)
+    hashed_password = await security.hash_password_async(body.new_password)
     current_user.hashed_password = hashed_password
     session.add(current_user)
     await session.commit()
+    invalidate_principal(current_user.id)
     return Message(message="Password updated successfully")
 
 
@@ -134,10 +166,16 @@ async def delete_user(session: SessionDep, current_user: CurrentUser) -> Any:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    statement = delete(Post).where(col(Post.owner_id) == current_user.id)
+    cache_keys = await post_crud.author_post_cache_keys(
+        session=session, author_id=current_user.id, nicknames=[current_user.nickname]
+    )
+    statement = delete(Post).where(col(Post.author_id) == current_user.id)
     await session.exec(statement)  
     await session.delete(current_user)
     await session.commit()
+    await cache.delete(*cache_keys)
+    invalidate_principal(current_user.id)
+    token_revocations.set(current_user.id, REVOKED)
     return Message(message="User deleted successfully")
 
 
@@ -148,7 +186,12 @@ async def read_user_by_id(
     """
     Get a user by id.
     """
-    user = await session.get(User, user_id)
+    # The caller's own row is already in the session, merged from the
+    # principal cache without roles; populate_existing makes the loader
+    # option apply to it too.
+    user = await session.get(
+        User, user_id, options=[selectinload(User.roles)], populate_existing=True
+    )
     if user == current_user:
         return user
     if not current_user.is_superuser:
@@ -166,7 +209,9 @@ async def read_user_by_id(
     """
     Get a user by nickname.
     """
-    user = await session.get(User, nickname)
+    user = await session.get(
+        User, nickname, options=[selectinload(User.roles)], populate_existing=True
+    )
     if user == current_user:
         return user
     if not current_user.is_superuser:
@@ -192,7 +237,9 @@ async def update_user(
     """
     Update a user.
     """
-    current_user = await session.get(User, user_id)
+    current_user = await session.get(
+        User, user_id, options=[selectinload(User.roles)], populate_existing=True
+    )
     if not current_user:
         raise HTTPException(
             status_code=404,
@@ -205,7 +252,12 @@ async def update_user(
                 status_code=409, detail="User with this email already exists"
             )
 
+    # Cached posts embed their author, and listings are keyed by the nickname.
+    cache_keys = await post_crud.author_post_cache_keys(
+        session=session, author_id=user_id, nicknames=[current_user.nickname, user_in.nickname]
+    )
     current_user = await crud.update_user(session=session, current_user=current_user, user_in=user_in)
+    await cache.delete(*cache_keys)
     return current_user
 
 
@@ -223,10 +275,16 @@ async def delete_user(
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    statement = delete(Post).where(col(Post.owner_id) == user_id)
+    cache_keys = await post_crud.author_post_cache_keys(
+        session=session, author_id=user_id, nicknames=[user.nickname]
+    )
+    statement = delete(Post).where(col(Post.author_id) == user_id)
     await session.exec(statement) 
     await session.delete(user)
     await session.commit()
+    await cache.delete(*cache_keys)
+    invalidate_principal(user_id)
+    token_revocations.set(user_id, REVOKED)
     return Message(message="User deleted successfully")
 
 
@@ -0,0 +1,112 @@
+import codecs
+import csv
+import io
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Iterable
+
+from fastapi import HTTPException
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a byte stream into decoded lines without buffering the whole body.
+    Lines keep their line endings; a multi-byte character may span chunks.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+class _LineFeed:
+    """
+    Lines a csv reader pulls from, appended as they arrive from the body.
+    """
+
+    def __init__(self) -> None:
+        self.lines: deque[str] = deque()
+
+    def __iter__(self) -> "_LineFeed":
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def read_records(
+    chunks: AsyncIterator[bytes], media_type: str
+) -> AsyncIterator[tuple[int, dict[str, Any] | None]]:
+    """
+    Yield (line number, record) from an NDJSON or CSV body. NDJSON has one
+    record per line; CSV takes its field names from the header row, and
+    quoted fields may span lines, as csv_line writes them. Records that
+    can't be parsed are yielded as None.
+    """
+    if media_type == NDJSON_MEDIA_TYPE:
+        async for number, line in _numbered(iter_lines(chunks)):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield number, record if isinstance(record, dict) else None
+    elif media_type == CSV_MEDIA_TYPE:
+        feed = _LineFeed()
+        reader = csv.DictReader(feed)
+        start, quotes = 0, 0
+        async for number, line in _numbered(iter_lines(chunks)):
+            if not feed.lines:
+                if not line.strip():
+                    continue
+                start = number
+            feed.lines.append(line)
+            # An odd number of quotes so far means a quoted field goes on
+            # past this line; the reader is only advanced on whole records.
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+            quotes = 0
+            if reader.line_num == 0:
+                reader.fieldnames  # reads the header row
+                continue
+            record = next(reader)
+            yield start, None if None in record or None in record.values() else record
+        if feed.lines and reader.line_num:
+            # Unterminated quoted field at the end of the body.
+            feed.lines.clear()
+            yield start, None
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Use {NDJSON_MEDIA_TYPE} or {CSV_MEDIA_TYPE}",
+        )
+
+
+async def _numbered(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, str]]:
+    number = 0
+    async for line in lines:
+        number += 1
+        yield number, line
+
+
+def ndjson_line(record: dict[str, Any]) -> str:
+    return json.dumps(record, default=str, separators=(",", ":")) + "\n"
+
+
+def csv_line(values: Iterable[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
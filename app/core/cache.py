@@ -0,0 +1,118 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Protocol
+
+from cachetools import TTLCache
+
+from app.core.config import CacheBackendEnum, settings
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # optional, only needed for CACHE_BACKEND=redis
+    aioredis = None
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> Any | None: ...
+
+    async def set(self, key: str, value: Any) -> None: ...
+
+    async def delete(self, *keys: str) -> None: ...
+
+
+class MemoryCacheBackend:
+    """
+    Per-process LRU cache with a TTL. Invalidation only reaches the current
+    worker; CACHE_TTL bounds staleness elsewhere.
+    """
+
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Any | None:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        self._cache[key] = value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._cache.pop(key, None)
+
+
+class RedisCacheBackend:
+    """
+    Cache shared by all workers, on any server speaking the Redis protocol.
+    Values must be JSON serializable.
+    """
+
+    def __init__(self, url: str, ttl: int) -> None:
+        if aioredis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        self._client = aioredis.from_url(url)
+        self._ttl = ttl
+
+    async def get(self, key: str) -> Any | None:
+        value = await self._client.get(key)
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._client.set(key, json.dumps(value), ex=self._ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*keys)
+
+
+class Cache:
+    """
+    Read-through cache with single-flight loading: concurrent misses for a
+    key share one loader call instead of stampeding the database.
+    """
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self.backend.get(key)
+        if value is not None:
+            return value
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+            # Skip the store if the key was invalidated while loading.
+            if value is not None and self._inflight.get(key) is future:
+                await self.backend.set(key, value)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # waiters re-raise it; don't log it as unretrieved
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        return value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._inflight.pop(key, None)
+        await self.backend.delete(*keys)
+
+
+def create_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == CacheBackendEnum.redis:
+        return RedisCacheBackend(settings.CACHE_URL, settings.CACHE_TTL)
+    return MemoryCacheBackend(settings.CACHE_SIZE, settings.CACHE_TTL)
+
+
+cache = Cache(create_backend())
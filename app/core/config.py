@@ -13,6 +13,16 @@ class ModeEnum(str, Enum):
     testing = "testing"
 
 
+class CacheBackendEnum(str, Enum):
+    memory = "memory"
+    redis = "redis"
+
+
+class ExecutorEnum(str, Enum):
+    thread = "thread"
+    process = "process"
+
+
 class Settings(BaseSettings):    
     MODE: ModeEnum = ModeEnum.development
     API_VERSION: str = "v1"
@@ -28,10 +38,34 @@ class Settings(BaseSettings):
     DATABASE_NAME: str
     DATABASE_CELERY_NAME: str = "celery_schedule_jobs"
     ASYNC_DATABASE_URI: PostgresDsn | str = ""
+    DATABASE_ECHO: bool = False
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100
+    # Loader for relationships no query asked for: "raise" fails on any lazy
+    # load, "raise_on_sql" only when the object isn't in the identity map.
+    DATABASE_RELATIONSHIP_LAZY: str = "raise"
+    # Per-route query counts and SQL timings, see /monitoring/routes.
+    # Development responses also get Server-Timing and X-DB-Query-Count.
+    REQUEST_METRICS_ENABLED: bool = True
+    # Optional read replica; read-only endpoints use the primary when empty.
+    ASYNC_DATABASE_READ_URI: str = ""
     DATETIME: str = datetime.utcnow().strftime("%m-%d-%Y, %H:%M:%S")
     DATESTAMP: str = datetime.utcnow().strftime("%m-%d-%Y_%H:%M:%S")
     UPLOAD_PATH: str
+    # Where UPLOAD_PATH is served; stored poster URLs are built from it.
+    UPLOAD_URL: str = "/upload"
     IMAGE_SIZE: list = [1200, 630]
+    IMAGE_WORKERS: int = 2
+    POSTER_WIDTHS: list[int] = [320, 640, 1200]
+    POSTER_FORMATS: list[str] = ["avif", "webp", "jpeg"]
+    POSTER_QUALITY: int = 80
+    UPLOAD_CACHE_MAX_AGE: int = 3600
+    # e.g. "/protected-upload" to let nginx send files via X-Accel-Redirect
+    UPLOAD_ACCEL_REDIRECT_PREFIX: str = ""
 
     EMAIL_USERNAME: str
     EMAIL_PASSWORD: str
@@ -43,8 +77,16 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool
     VALIDATE_CERTS: bool
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int
-    EMAILS_ENABLED: str
+    EMAILS_ENABLED: bool
     EMAILS_FROM_NAME: str
+    # Directory for compiled template bytecode; defaults to a temp directory.
+    EMAIL_TEMPLATES_CACHE_DIR: str | None = None
+    EMAIL_SMTP_POOL_SIZE: int = 2
+    EMAIL_SMTP_TIMEOUT: float = 10
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_POLL_INTERVAL: float = 5
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    EMAIL_OUTBOX_RETRY_BACKOFF: int = 30
 
     @field_validator("ASYNC_DATABASE_URI", mode="after")
     def assemble_db_connection(cls, v: str | None, info: FieldValidationInfo) -> Any:
@@ -72,6 +114,47 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: list[str] | list[AnyHttpUrl]
     JWT_ALGORITHM: str
 
+    PASSWORD_HASH_EXECUTOR: ExecutorEnum = ExecutorEnum.thread
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60
+
+    # Embed role, superuser, active and token version claims in access tokens
+    # so authorization needs no query while the version is current.
+    STATELESS_AUTH: bool = False
+    TOKEN_REVOCATION_SIZE: int = 100000
+    TOKEN_REVOCATION_REFRESH_INTERVAL: float = 30
+
+    # Serialize list endpoints once with a precompiled TypeAdapter instead of
+    # going through response_model validation.
+    FAST_JSON_RESPONSES: bool = False
+
+    COUNT_CACHE_SIZE: int = 1024
+    COUNT_CACHE_TTL: int = 30
+
+    CACHE_BACKEND: CacheBackendEnum = CacheBackendEnum.memory
+    CACHE_URL: str = "redis://localhost:6379/0"
+    CACHE_SIZE: int = 10000
+    CACHE_TTL: int = 60
+
+    # Cache-Control for post reads; drafts are only visible to their author.
+    POST_CACHE_CONTROL: str = "private, no-cache"
+    PUBLISHED_POST_CACHE_CONTROL: str = "private, max-age=60"
+
+    SUGGEST_CACHE_SIZE: int = 4096
+    SUGGEST_CACHE_TTL: int = 60
+    SUGGEST_TIMEOUT_MS: int = 50
+
+    BULK_IMPORT_BATCH_SIZE: int = 1000
+    BULK_IMPORT_MAX_ERRORS: int = 100
+    # Rows fetched per round trip by streaming responses.
+    STREAM_BATCH_SIZE: int = 1000
+    # Largest `limit` accepted by paginated list endpoints.
+    MAX_PAGE_SIZE: int = 1000
+
     @field_validator("BACKEND_CORS_ORIGINS")
     def assemble_cors_origins(cls, v: str | list[str]) -> list[str] | str:
         if isinstance(v, str) and not v.startswith("["):
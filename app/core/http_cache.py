@@ -0,0 +1,27 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def cache_headers(etag: str, cache_control: str) -> dict[str, str]:
+    # Responses depend on the bearer token, so caches must key on it.
+    return {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
@@ -0,0 +1,80 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: str | None = None
+    pool_wait_ms: float = 0.0
+    statements: list[str] = field(default_factory=list)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.duration_ms += elapsed_ms
+        self.statements.append(statement)
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+
+# Trackers of the enclosing tracked blocks, outermost first; nested blocks all
+# see every statement. SQLAlchemy runs the sync engine in a greenlet that
+# shares the calling task's context, so the hooks see them too.
+_active_stats: ContextVar[tuple[QueryStats, ...]] = ContextVar("query_stats", default=())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active_stats.get():
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for stats in _active_stats.get():
+        stats.record(statement, elapsed_ms)
+
+
+def install_query_hooks(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def active_query_stats() -> tuple[QueryStats, ...]:
+    return _active_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Count the statements executed by the current task inside the block.
+    """
+    stats = QueryStats()
+    token = _active_stats.set((*_active_stats.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """
+    Fail with the executed statements if the block runs more than `limit` queries.
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        statements = "\n".join(f"  {statement}" for statement in stats.statements)
+        raise AssertionError(f"Expected at most {limit} queries, got {stats.count}:\n{statements}")
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import smtplib
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.models.email_outbox_model import EmailOutbox, EmailStatus
+
+
+class SMTPConnectionPool:
+    """
+    Keeps authenticated SMTP connections open between batches so sends skip
+    the connect, TLS and login round-trips. Used from worker threads.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._idle: list[smtplib.SMTP] = []
+
+    def _connect(self) -> smtplib.SMTP:
+        if settings.EMAIL_SSL_TLS and not settings.EMAIL_STARTTLS:
+            connection = smtplib.SMTP_SSL(
+                settings.EMAIL_SERVER, settings.EMAIL_PORT, timeout=settings.EMAIL_SMTP_TIMEOUT
+            )
+        else:
+            connection = smtplib.SMTP(
+                settings.EMAIL_SERVER, settings.EMAIL_PORT, timeout=settings.EMAIL_SMTP_TIMEOUT
+            )
+            if settings.EMAIL_STARTTLS:
+                connection.starttls()
+        if settings.EMAIL_FROM and settings.EMAIL_PASSWORD:
+            connection.login(settings.EMAIL_FROM, settings.EMAIL_PASSWORD)
+        return connection
+
+    def acquire(self) -> smtplib.SMTP:
+        while self._idle:
+            connection = self._idle.pop()
+            try:
+                if connection.noop()[0] == 250:
+                    return connection
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(connection)
+        return self._connect()
+
+    def release(self, connection: smtplib.SMTP) -> None:
+        if len(self._idle) < self.size:
+            self._idle.append(connection)
+        else:
+            self._discard(connection)
+
+    def close(self) -> None:
+        while self._idle:
+            self._discard(self._idle.pop())
+
+    def _discard(self, connection: smtplib.SMTP) -> None:
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+    def send_batch(self, messages: list[EmailMessage]) -> list[str | None]:
+        """
+        Send messages over one pooled connection, reconnecting once if the
+        server drops it. Returns an error string (or None) per message.
+        """
+        errors: list[str | None] = []
+        connection = None
+        for message in messages:
+            for retry in (False, True):
+                try:
+                    if connection is None:
+                        connection = self.acquire()
+                except (smtplib.SMTPException, OSError) as exc:
+                    # Server unreachable: fail the rest of the batch now.
+                    return errors + [repr(exc)] * (len(messages) - len(errors))
+                try:
+                    connection.send_message(message)
+                    errors.append(None)
+                    break
+                except smtplib.SMTPServerDisconnected as exc:
+                    connection = None
+                    if retry:
+                        errors.append(repr(exc))
+                except smtplib.SMTPResponseException as exc:
+                    # The server rejected this message; the connection is fine.
+                    errors.append(repr(exc))
+                    break
+                except (smtplib.SMTPException, OSError) as exc:
+                    self._discard(connection)
+                    connection = None
+                    errors.append(repr(exc))
+                    break
+        if connection is not None:
+            self.release(connection)
+        return errors
+
+
+class MailOutbox:
+    """
+    Outgoing email queue. Messages are committed to the email_outbox table
+    and the in-process worker is woken up to send them in batches; rows
+    that fail are retried with exponential backoff. The table is the source
+    of truth, so messages survive restarts and rows are claimed with
+    SKIP LOCKED so several app workers can drain it concurrently.
+    """
+
+    def __init__(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._smtp = SMTPConnectionPool(settings.EMAIL_SMTP_POOL_SIZE)
+
+    async def enqueue(self, *, email_to: str, subject: str, html_content: str) -> uuid.UUID:
+        message = EmailOutbox(email_to=email_to, subject=subject, html_content=html_content)
+        async with AsyncSessionLocal() as session:
+            session.add(message)
+            await session.commit()
+        self._wakeup.set()
+        return message.id
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await run_in_threadpool(self._smtp.close)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.process_batch()
+            except Exception:
+                logging.exception("Email outbox batch failed")
+                processed = 0
+            if processed < settings.EMAIL_OUTBOX_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), settings.EMAIL_OUTBOX_POLL_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def process_batch(self) -> int:
+        """
+        Send one batch of due messages and record the outcome. Returns the
+        number of messages processed.
+        """
+        async with AsyncSessionLocal() as session:
+            statement = (
+                select(EmailOutbox)
+                .where(EmailOutbox.status == EmailStatus.pending)
+                .where(EmailOutbox.next_attempt_at <= datetime.utcnow())
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            messages = (await session.scalars(statement)).all()
+            if not messages:
+                return 0
+            errors = await run_in_threadpool(
+                self._smtp.send_batch, [build_message(message) for message in messages]
+            )
+            now = datetime.utcnow()
+            for message, error in zip(messages, errors):
+                message.attempts += 1
+                message.last_error = error
+                if error is None:
+                    message.status = EmailStatus.sent
+                    message.sent_at = now
+                elif message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    message.status = EmailStatus.failed
+                    logging.error(f"Giving up on email {message.id}: {error}")
+                else:
+                    backoff = settings.EMAIL_OUTBOX_RETRY_BACKOFF * 2 ** (message.attempts - 1)
+                    message.next_attempt_at = now + timedelta(seconds=backoff)
+                session.add(message)
+            await session.commit()
+            return len(messages)
+
+
+def build_message(message: EmailOutbox) -> EmailMessage:
+    email_message = EmailMessage()
+    email_message["Subject"] = message.subject
+    email_message["From"] = formataddr((settings.EMAILS_FROM_NAME, settings.EMAIL_FROM))
+    email_message["To"] = message.email_to
+    email_message.set_content(message.html_content, subtype="html")
+    return email_message
+
+
+mail_outbox = MailOutbox()
+
+
+async def enqueue_email(*, email_to: str, subject: str = "", html_content: str = "") -> uuid.UUID:
+    return await mail_outbox.enqueue(
+        email_to=email_to, subject=subject, html_content=html_content
+    )
@@ -0,0 +1,34 @@
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds in milliseconds; the last bucket collects everything slower.
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """
+    Bucketed histogram of durations in milliseconds.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS_MS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "avg_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
@@ -0,0 +1,108 @@
+import time
+from typing import Any
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.instrumentation import QueryStats, track_queries
+from app.core.metrics import Histogram
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RouteStats:
+    """
+    Aggregated request and SQL timings for one route.
+    """
+
+    def __init__(self) -> None:
+        self.duration = Histogram()
+        self.db_time = Histogram()
+        self.pool_wait = Histogram()
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.slowest_ms = 0.0
+        self.slowest_statement: str | None = None
+
+    def observe(self, duration_ms: float, stats: QueryStats) -> None:
+        self.duration.observe(duration_ms)
+        self.db_time.observe(stats.duration_ms)
+        self.pool_wait.observe(stats.pool_wait_ms)
+        self.queries.observe(stats.count)
+        if stats.slowest_ms > self.slowest_ms:
+            self.slowest_ms = stats.slowest_ms
+            self.slowest_statement = stats.slowest_statement
+
+    def snapshot(self) -> dict[str, Any]:
+        queries = self.queries.snapshot()
+        return {
+            "requests": self.duration.count,
+            "queries": {
+                "total": int(queries["total_ms"]),
+                "avg": queries["avg_ms"],
+                "max": int(queries["max_ms"]),
+                "buckets": queries["buckets"],
+            },
+            "duration_ms": self.duration.snapshot(),
+            "db_ms": self.db_time.snapshot(),
+            "pool_wait_ms": self.pool_wait.snapshot(),
+            "slowest_statement": {
+                "duration_ms": round(self.slowest_ms, 3),
+                "sql": self.slowest_statement,
+            },
+        }
+
+
+# Keyed by "METHOD /path/{template}" so path parameters don't split routes.
+route_stats: dict[str, RouteStats] = {}
+
+
+def get_route_stats() -> dict[str, Any]:
+    return {route: stats.snapshot() for route, stats in sorted(route_stats.items())}
+
+
+def server_timing(stats: QueryStats, duration_ms: float) -> str:
+    return (
+        f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries", '
+        f"pool;dur={stats.pool_wait_ms:.1f}, "
+        f"app;dur={duration_ms:.1f}"
+    )
+
+
+class QueryStatsMiddleware:
+    """
+    Track the SQL each request runs. Stats are aggregated per route and, with
+    `expose_headers`, returned in Server-Timing and X-DB-Query-Count headers.
+
+    Queries from background tasks run after the response count towards the
+    route totals but not the headers.
+    """
+
+    def __init__(self, app: ASGIApp, *, expose_headers: bool = False) -> None:
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                duration_ms = (time.perf_counter() - start) * 1000
+                headers.append("Server-Timing", server_timing(stats, duration_ms))
+                headers.append("X-DB-Query-Count", str(stats.count))
+            await send(message)
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_with_headers if self.expose_headers else send)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    key = f"{scope['method']} {route.path_format}"
+                    route_stats.setdefault(key, RouteStats()).observe(
+                        (time.perf_counter() - start) * 1000, stats
+                    )
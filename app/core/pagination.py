@@ -0,0 +1,110 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Sequence
+
+from cachetools import TTLCache
+from fastapi import HTTPException
+from sqlalchemy import text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import func, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.core.config import settings
+from app.schemas.common_schema import CountMode
+
+# Exact counts keyed by the compiled count statement and its parameters.
+_count_cache: TTLCache = TTLCache(
+    maxsize=settings.COUNT_CACHE_SIZE, ttl=settings.COUNT_CACHE_TTL
+)
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def paginate(
+    statement: SelectOfScalar, model: Any, *, skip: int, limit: int | None, cursor: str | None
+) -> SelectOfScalar:
+    """
+    Order by (created_at, id) and apply either the keyset cursor or the offset.
+
+    A `limit` of None leaves the result unbounded, for streaming.
+    """
+    statement = statement.order_by(model.created_at, model.id)
+    if limit is not None:
+        statement = statement.limit(limit)
+    if cursor is None:
+        return statement.offset(skip)
+    try:
+        created_at, id = decode_cursor(cursor)
+        values = (datetime.fromisoformat(created_at), uuid.UUID(id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return statement.where(tuple_(model.created_at, model.id) > values)
+
+
+def next_cursor(rows: Sequence[Any], limit: int) -> str | None:
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.created_at.isoformat(), last.id)
+
+
+async def count_rows(
+    session: AsyncSession, model: Any, *whereclauses: Any, mode: CountMode
+) -> int | None:
+    """
+    Count rows of `model` matching `whereclauses` according to `mode`.
+
+    `none` skips counting, `estimate` reads planner statistics and `exact`
+    runs COUNT(*) once per COUNT_CACHE_TTL for each distinct filter.
+    """
+    if mode == CountMode.none:
+        return None
+    if mode == CountMode.estimate:
+        estimate = await _estimate_rows(session, model, *whereclauses)
+        if estimate >= 0:
+            return estimate
+    statement = select(func.count()).select_from(model).where(*whereclauses)
+    compiled = statement.compile()
+    key = (str(compiled), tuple(sorted(compiled.params.items())))
+    count = _count_cache.get(key)
+    if count is None:
+        count = await session.scalar(statement)
+        _count_cache[key] = count
+    return count
+
+
+async def _estimate_rows(session: AsyncSession, model: Any, *whereclauses: Any) -> int:
+    if not whereclauses:
+        # reltuples is -1 until the table has been vacuumed or analyzed.
+        statement = text(
+            "SELECT reltuples::bigint FROM pg_class "
+            "WHERE relname = :table AND relnamespace = current_schema()::regnamespace"
+        )
+        estimate = await session.scalar(statement, {"table": model.__tablename__})
+        return -1 if estimate is None else int(estimate)
+    query = select(model.id).where(*whereclauses).compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    # Sent as is: text() would take ":word" inside the rendered literals for
+    # bind parameters.
+    connection = await session.connection()
+    plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {query}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,32 @@
+import uuid
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.models.user_model import User
+
+# Authenticated users keyed by token ``sub``. The cache is per process, so
+# invalidation only reaches the current worker; PRINCIPAL_CACHE_TTL bounds how
+# long other workers can serve a stale principal.
+_principals: TTLCache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+
+def get_cached_principal(sub: str) -> User | None:
+    if not settings.PRINCIPAL_CACHE_ENABLED:
+        return None
+    return _principals.get(sub)
+
+
+def cache_principal(user: User) -> None:
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        _principals[str(user.id)] = user
+
+
+def invalidate_principal(user_id: uuid.UUID | str) -> None:
+    _principals.pop(str(user_id), None)
+
+
+def clear_principals() -> None:
+    _principals.clear()
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import uuid
+
+from cachetools import LRUCache
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.models.user_model import User
+
+# Token version of users that are deleted or inactive; never matches a token.
+REVOKED = -1
+
+
+class TokenRevocations:
+    """
+    Current token version of each user this worker has authenticated.
+
+    Stateless tokens carry the version they were issued with and are only
+    accepted while it matches. Bumps made by this worker apply at once;
+    bumps made elsewhere are picked up by the periodic refresh, so a revoked
+    token lives at most TOKEN_REVOCATION_REFRESH_INTERVAL seconds longer.
+    """
+
+    def __init__(self) -> None:
+        # LRU rather than TTL: the refresh rewrites every entry, which would
+        # keep resetting a TTL. Least recently authenticated users drop out.
+        self._versions: LRUCache = LRUCache(maxsize=settings.TOKEN_REVOCATION_SIZE)
+        self._task: asyncio.Task | None = None
+
+    def get(self, sub: str) -> int | None:
+        return self._versions.get(sub)
+
+    def set(self, user_id: uuid.UUID | str, version: int) -> None:
+        self._versions[str(user_id)] = version
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refresh(self) -> None:
+        """
+        Reload the versions of every tracked user; missing users are revoked.
+        """
+        subs = list(self._versions.keys())
+        for offset in range(0, len(subs), 1000):
+            chunk = subs[offset:offset + 1000]
+            statement = select(User.id, User.token_version, User.is_active).where(
+                User.id.in_([uuid.UUID(sub) for sub in chunk])
+            )
+            async with AsyncSessionLocal() as session:
+                rows = (await session.execute(statement)).all()
+            found = {
+                str(user_id): version if is_active else REVOKED
+                for user_id, version, is_active in rows
+            }
+            for sub in chunk:
+                if sub in self._versions:
+                    self._versions[sub] = found.get(sub, REVOKED)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TOKEN_REVOCATION_REFRESH_INTERVAL)
+            try:
+                await self.refresh()
+            except Exception:
+                logging.exception("Token revocation refresh failed")
+
+
+token_revocations = TokenRevocations()
@@ -1,23 +1,39 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Callable
 
 import jwt
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-from app.core.config import settings
+from app.core.config import ExecutorEnum, settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is CPU bound, so hashing runs in a dedicated pool. The semaphore caps
+# concurrent jobs at the pool size and _password_pending counts jobs that are
+# running or waiting for a slot, so a login storm is shed with 503 instead of
+# growing an unbounded backlog on the event loop.
+_password_executor: Executor | None = None
+_password_slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+_password_pending = 0
 
 
-def create_access_token(subject: str | Any, expires_delta: timedelta = None) -> str:
+
+def create_access_token(
+    subject: str | Any, expires_delta: timedelta = None, claims: dict[str, Any] | None = None
+) -> str:
+    """
+    Signed access token for `subject`, with any extra `claims` embedded.
+    """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject), "type": "access"}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject), "type": "access"}
 
     return jwt.encode(
         payload=to_encode,
@@ -52,4 +68,52 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+def get_password_executor() -> Executor:
+    global _password_executor
+    if _password_executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == ExecutorEnum.process:
+            _password_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS
+            )
+        else:
+            _password_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+    return _password_executor
+
+
+def shutdown_password_executor() -> None:
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
+
+
+async def _run_password_job(func: Callable[..., Any], *args: Any) -> Any:
+    global _password_pending
+    capacity = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE
+    if _password_pending >= capacity:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, try again later",
+            headers={"Retry-After": "1"},
+        )
+    _password_pending += 1
+    try:
+        async with _password_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_password_executor(), func, *args)
+    finally:
+        _password_pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_job(get_password_hash, password)
\ No newline at end of file
@@ -0,0 +1,45 @@
+from functools import lru_cache
+from typing import Any, Iterable
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+
+@lru_cache
+def get_type_adapter(schema: type) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def fast_json_response(
+    schema: type, content: Any, headers: dict[str, str] | None = None
+) -> Response:
+    """
+    Validate `content` against `schema` once and return the JSON bytes
+    straight from pydantic-core. FastAPI skips its response_model pass for
+    Response objects, so rows are not dumped, re-validated and encoded again.
+    """
+    adapter = get_type_adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def ndjson_lines(schema: type, rows: Iterable[Any]) -> bytes:
+    """
+    Serialize `rows` as newline-delimited JSON, one `schema` object per line.
+    """
+    adapter = get_type_adapter(schema)
+    return b"".join(
+        adapter.dump_json(adapter.validate_python(row, from_attributes=True)) + b"\n"
+        for row in rows
+    )
+
+
+def list_response(schema: type, headers: dict[str, str] | None = None, **content: Any) -> Any:
+    """
+    Build a list payload, on the fast path when FAST_JSON_RESPONSES is on.
+    """
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json_response(schema, content, headers)
+    return schema(**content)
@@ -1,14 +1,100 @@
+import time
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-async_engine = create_async_engine(
-   url=settings.ASYNC_DATABASE_URI.unicode_string(),
-   echo=True,
-   future=True
-)
+from app.core.config import settings
+from app.core.instrumentation import active_query_stats, install_query_hooks
+from app.core.metrics import Histogram
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = Histogram()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.wait_histogram = self.wait_histogram
+        return pool
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.wait_histogram.observe(elapsed_ms)
+            for stats in active_query_stats():
+                stats.pool_wait_ms += elapsed_ms
+
+
+def create_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(
+       url=url,
+       echo=settings.DATABASE_ECHO,
+       future=True,
+       poolclass=InstrumentedQueuePool,
+       pool_size=settings.DATABASE_POOL_SIZE,
+       max_overflow=settings.DATABASE_MAX_OVERFLOW,
+       pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+       pool_recycle=settings.DATABASE_POOL_RECYCLE,
+       pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+       connect_args={
+           # asyncpg's own statement cache and SQLAlchemy's prepared statement
+           # cache; set to 0 when running behind pgbouncer in transaction mode.
+           "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+           "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+       },
+    )
+    install_query_hooks(engine)
+    return engine
+
+
+async_engine = create_engine(settings.ASYNC_DATABASE_URI.unicode_string())
 
 AsyncSessionLocal = sessionmaker(
     bind=async_engine, class_=AsyncSession, expire_on_commit=False
-)
\ No newline at end of file
+)
+
+async_read_engine = (
+    create_engine(settings.ASYNC_DATABASE_READ_URI)
+    if settings.ASYNC_DATABASE_READ_URI
+    else None
+)
+
+AsyncReadSessionLocal = (
+    sessionmaker(bind=async_read_engine, class_=AsyncSession, expire_on_commit=False)
+    if async_read_engine
+    else None
+)
+
+
+# For work done outside a request's read session, e.g. streaming responses.
+StreamSessionLocal = AsyncReadSessionLocal or AsyncSessionLocal
+
+
+def get_pool_stats() -> dict[str, Any]:
+    stats = {"primary": _engine_pool_stats(async_engine)}
+    if async_read_engine:
+        stats["replica"] = _engine_pool_stats(async_read_engine)
+    return stats
+
+
+def _engine_pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "wait_ms": pool.wait_histogram.snapshot(),
+    }
@@ -0,0 +1,114 @@
+import os
+import re
+from typing import AsyncIterator
+from urllib.parse import quote
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.core.config import settings
+
+# Poster variants are named <sha256>_<width>.<ext> and never change in place.
+CONTENT_HASH_NAME = re.compile(r"^[0-9a-f]{64}_\d+\.\w+$")
+RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+RANGE_CHUNK_SIZE = 64 * 1024
+
+
+class UploadFiles(StaticFiles):
+    """
+    StaticFiles for user uploads with long-lived caching for content-hashed
+    names, single byte-range requests and optional X-Accel-Redirect offload.
+    """
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        headers = {"accept-ranges": "bytes"}
+        if CONTENT_HASH_NAME.match(name):
+            headers["etag"] = f'"{name}"'
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            headers["cache-control"] = f"public, max-age={settings.UPLOAD_CACHE_MAX_AGE}"
+        response = FileResponse(
+            full_path, status_code=status_code, headers=headers, stat_result=stat_result
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        if settings.UPLOAD_ACCEL_REDIRECT_PREFIX:
+            return self.accel_response(full_path, response)
+
+        range_header = request_headers.get("range")
+        etag = response.headers["etag"]
+        if (
+            range_header
+            and status_code == 200
+            and request_headers.get("if-range", etag) == etag
+        ):
+            return self.range_response(
+                full_path, stat_result.st_size, range_header, response
+            )
+        return response
+
+    def accel_response(self, full_path: str, response: FileResponse) -> Response:
+        """
+        Hand the transfer to the front proxy (nginx X-Accel-Redirect).
+        """
+        relative_path = os.path.relpath(full_path, self.directory)
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key != "content-length"
+        }
+        headers["x-accel-redirect"] = (
+            settings.UPLOAD_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(relative_path)
+        )
+        return Response(headers=headers, media_type=response.media_type)
+
+    def range_response(
+        self, full_path: str, file_size: int, range_header: str, response: FileResponse
+    ) -> Response:
+        match = RANGE.fullmatch(range_header.strip())
+        if not match or match.groups() == ("", ""):
+            # Multiple or malformed ranges: serve the whole file.
+            return response
+        start, end = match.groups()
+        if start:
+            first = int(start)
+            last = min(int(end), file_size - 1) if end else file_size - 1
+        else:
+            first = max(0, file_size - int(end))
+            last = file_size - 1
+        if first > last or first >= file_size:
+            return Response(
+                status_code=416, headers={"content-range": f"bytes */{file_size}"}
+            )
+        length = last - first + 1
+        headers = dict(response.headers)
+        headers["content-range"] = f"bytes {first}-{last}/{file_size}"
+        headers["content-length"] = str(length)
+        return StreamingResponse(
+            _read_range(full_path, first, length),
+            status_code=206,
+            headers=headers,
+            media_type=response.media_type,
+        )
+
+
+async def _read_range(full_path: str, start: int, length: int) -> AsyncIterator[bytes]:
+    async with await anyio.open_file(full_path, "rb") as file:
+        await file.seek(start)
+        while length > 0:
+            chunk = await file.read(min(RANGE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
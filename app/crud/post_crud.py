@@ -1,12 +1,46 @@
-from typing import Any
-from fastapi import HTTPException, UploadFile
+import asyncio
+import html
+import logging
+import os
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable
+from fastapi import BackgroundTasks, HTTPException, UploadFile
+from pydantic import ValidationError
 from slugify import slugify
+from sqlalchemy import func, insert, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import Session, select
 from app.api.deps import CurrentUser
-from app.models.post_model import Post
-from app.models.tag_model import Tag
-from app.utils import thumbnail_post_image
-from app.schemas.post_schema import PostUpdate
+from app.core.bulk import csv_line, ndjson_line
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.pagination import decode_cursor
+from app.core.serialization import ndjson_lines
+from app.core.session import AsyncSessionLocal, StreamSessionLocal
+from app.models.post_model import SEARCH_CONFIG, Post, PosterStatus, post_search_vector
+from app.models.role_model import Role
+from app.models.user_model import User
+from app.models.tag_model import PostTag, Tag
+from app.utils import (
+    discard_upload,
+    generate_poster_variants,
+    get_image_executor,
+    save_upload,
+    shutdown_image_executor,
+)
+from app.schemas.common_schema import BulkFormat, CountMode
+from app.schemas.post_schema import (
+    BulkImportError, 
+    BulkImportResult, 
+    PostImport, 
+    PostPublic, 
+    PostSummary, 
+    PostUpdate,
+)
 
 
 async def get_post_by_title(*, session: Session, title: str) -> Post | None:    
@@ -14,44 +48,469 @@ async def get_post_by_title(*, session: Session, title: str) -> Post | None:
     session_post = await session.scalar(statement)
     return session_post
 
-async def post_create(*, session: Session, current_user: CurrentUser, title: str, description: str, tags: list, file: UploadFile, content: str) -> Post:
-    poster = thumbnail_post_image(file=file, email=current_user.email)
+# Loader options for everything PostPublic serializes. Relationships raise on
+# lazy load, so any query whose posts are returned as PostPublic needs these.
+POST_PUBLIC_OPTIONS = (joinedload(Post.author).selectinload(User.roles),)
+
+# Columns behind PostPublic / PostSummary and the nested author. Anything not
+# listed here (search_vector, status, updated_by...) never leaves the database.
+POST_LIST_COLUMNS = (
+    Post.id,
+    Post.title,
+    Post.description,
+    Post.created_at,
+    Post.updated_at,
+    Post.slug,
+    Post.poster,
+    Post.poster_status,
+    Post.poster_variants,
+    Post.author_id,
+)
+AUTHOR_COLUMNS = (
+    User.nickname,
+    User.first_name,
+    User.last_name,
+    User.email,
+    User.phone,
+    User.city,
+    User.state,
+    User.country,
+    User.address,
+    User.picture,
+)
+
+
+def select_post_rows(*, summary: bool = False) -> Any:
+    """
+    Select the listing columns of posts joined with their author's columns.
+
+    With `summary` the post `content` is left out.
+    """
+    columns = list(POST_LIST_COLUMNS)
+    if not summary:
+        columns.append(Post.content)
+    author = [column.label(f"author_{column.key}") for column in AUTHOR_COLUMNS]
+    return select(*columns, *author).join(User, User.id == Post.author_id)
+
+
+async def read_post_rows(*, session: Session, statement: Any) -> tuple[list[Any], list[dict]]:
+    """
+    Run a `select_post_rows` statement and shape the rows like PostPublic.
+
+    Author roles are fetched in one extra query for the whole page. Returns
+    the raw rows (for cursors) and the payload dicts.
+    """
+    rows = (await session.execute(statement)).all()
+    return rows, await shape_post_rows(session=session, rows=rows)
+
+
+async def stream_post_rows(*, statement: Any, summary: bool = False) -> AsyncIterator[bytes]:
+    """
+    Stream a `select_post_rows` statement as NDJSON through a server-side
+    cursor, STREAM_BATCH_SIZE rows at a time, so memory stays flat however
+    many rows match. Opens its own session, as the request's is closed by
+    the time a streaming response is sent.
+    """
+    schema = PostSummary if summary else PostPublic
+    async with StreamSessionLocal() as session:
+        result = await session.stream(
+            statement.execution_options(yield_per=settings.STREAM_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield ndjson_lines(schema, await shape_post_rows(session=session, rows=rows))
+
+
+async def shape_post_rows(*, session: Session, rows: list[Any]) -> list[dict]:
+    author_ids = {row.author_id for row in rows}
+    roles: dict[uuid.UUID, list[dict]] = {author_id: [] for author_id in author_ids}
+    if author_ids:
+        statement = select(Role.name, Role.description, Role.user_id).where(Role.user_id.in_(author_ids))
+        for role in (await session.execute(statement)).mappings():
+            roles[role["user_id"]].append(dict(role))
+    data = []
+    for row in rows:
+        post = {}
+        author = {"roles": roles[row.author_id]}
+        for key, value in row._mapping.items():
+            if key.startswith("author_") and key != "author_id":
+                author[key.removeprefix("author_")] = value
+            else:
+                post[key] = value
+        post["author"] = author
+        data.append(post)
+    return data
+
+
+async def get_post(*, session: Session, post_id: uuid.UUID) -> Post | None:
+    """
+    Post by id with the author and roles PostPublic needs.
+    """
+    statement = (
+        select(Post)
+        .where(Post.id == post_id)
+        .options(*POST_PUBLIC_OPTIONS)
+        .execution_options(populate_existing=True)
+    )
+    return await session.scalar(statement)
+
+
+async def post_cache_keys(*, session: Session, post: Post) -> list[str]:
+    """
+    Cache keys of the reads of `post`: by id, by slug and its author's
+    listings. Collect them before committing a change to the post and drop
+    them once the commit succeeded.
+    """
+    nickname = await session.scalar(select(User.nickname).where(User.id == post.author_id))
+    return [f"post:id:{post.id}", f"post:slug:{post.slug}", *author_cache_keys(nickname)]
+
+
+async def author_post_cache_keys(
+    *, session: Session, author_id: uuid.UUID, nicknames: Iterable[str | None]
+) -> list[str]:
+    """
+    Cache keys of every read that embeds the author: each of their posts by
+    id and slug, and their listings under each of `nicknames`.
+    """
+    rows = (await session.execute(select(Post.id, Post.slug).where(Post.author_id == author_id))).all()
+    keys = [key for id, slug in rows for key in (f"post:id:{id}", f"post:slug:{slug}")]
+    return keys + [key for nickname in set(nicknames) for key in author_cache_keys(nickname)]
+
+
+def author_cache_keys(nickname: str | None) -> list[str]:
+    if not nickname:
+        return []
+    return [f"post:author:{nickname}:{mode.value}" for mode in CountMode]
+
+
+# ts_headline match delimiters; neither can appear in an escaped snippet.
+SNIPPET_START = "\x02"
+SNIPPET_STOP = "\x03"
+
+
+async def search_posts(*, session: Session, query: str, limit: int, cursor: str | None) -> list[Any]:
+    """
+    Published posts matching a web-search style query, best rank first.
+
+    Returns (post, rank, snippet) rows; snippets are only built for the page.
+    Snippets are HTML-escaped, with only the matches wrapped in `<mark>`.
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    rank = func.ts_rank_cd(post_search_vector, tsquery)
+    hits = (
+        select(Post.id, rank.label("rank"))
+        .where(Post.status == True)
+        .where(post_search_vector.op("@@")(tsquery))
+    )
+    if cursor:
+        try:
+            last_rank, last_id = decode_cursor(cursor)
+            values = (float(last_rank), uuid.UUID(last_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        hits = hits.where(tuple_(rank, Post.id) < values)
+    hits = hits.order_by(rank.desc(), Post.id.desc()).limit(limit).subquery()
+    # Matches are delimited with control characters, stripped from the text
+    # first, and only turned into <mark> once the snippet has been escaped.
+    text = func.translate(func.coalesce(Post.content, Post.description), SNIPPET_START + SNIPPET_STOP, "")
+    snippet = func.ts_headline(
+        SEARCH_CONFIG,
+        text,
+        tsquery,
+        f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxFragments=2, MaxWords=30, MinWords=10",
+    )
+    statement = (
+        select(Post, hits.c.rank, snippet.label("snippet"))
+        .join(hits, hits.c.id == Post.id)
+        .options(*POST_PUBLIC_OPTIONS)
+        .order_by(hits.c.rank.desc(), Post.id.desc())
+    )
+    rows = (await session.execute(statement)).all()
+    return [(post, rank, mark_snippet(snippet)) for post, rank, snippet in rows]
+
+
+def mark_snippet(snippet: str | None) -> str | None:
+    """
+    Escape a ts_headline snippet and turn its match delimiters into <mark>.
+    """
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SNIPPET_START, "<mark>").replace(SNIPPET_STOP, "</mark>")
+
+
+def normalize_tags(raw: Iterable[str]) -> list[str]:
+    """
+    Split comma separated tag input into unique lowercase alphanumeric names,
+    keeping their first-seen order.
+    """
+    names = []
+    for item in raw:
+        for tag in item.split(","):
+            name = "".join(letter for letter in tag if letter.isalnum()).lower()
+            if name:
+                names.append(name[:255])
+    return list(dict.fromkeys(names))
+
+
+async def upsert_tags(*, session: Session, names: list[str]) -> dict[str, uuid.UUID]:
+    """
+    Create the missing tags and return the ids of all `names`.
+
+    One INSERT ... ON CONFLICT DO NOTHING creates the new tags without
+    touching existing rows, then one SELECT reads the ids of the rest.
+    Names are inserted in sorted order, so concurrent callers wait on
+    each other's new tags in the same order instead of deadlocking.
+    """
+    if not names:
+        return {}
+    names = sorted(set(names))
+    now = datetime.utcnow()
+    statement = (
+        pg_insert(Tag)
+        .values([{"id": uuid.uuid4(), "name": name, "created_at": now, "updated_at": now} for name in names])
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(Tag.name, Tag.id)
+    )
+    tag_ids = dict((await session.execute(statement)).tuples().all())
+    existing = [name for name in names if name not in tag_ids]
+    if existing:
+        statement = select(Tag.name, Tag.id).where(Tag.name.in_(existing))
+        tag_ids.update((await session.execute(statement)).tuples().all())
+    return tag_ids
+
+
+async def import_posts(
+    *, author: User, records: AsyncIterator[tuple[int, dict | None]]
+) -> BulkImportResult:
+    """
+    Insert posts by `author` from (line number, record) pairs in batches,
+    in its own session.
+
+    Each batch is one multi-row INSERT that skips existing titles, one tag
+    upsert and one post_tag INSERT, then a commit. Invalid records and
+    duplicate titles are skipped and reported with their line numbers.
+    """
+    async with AsyncSessionLocal() as session:
+        return await _import_posts(session=session, author=author, records=records)
+
+
+async def _import_posts(
+    *, session: Session, author: User, records: AsyncIterator[tuple[int, dict | None]]
+) -> BulkImportResult:
+    result = BulkImportResult()
+    batch: list[tuple[int, PostImport]] = []
+    async for line, record in records:
+        if record is None:
+            _skip(result, line, "Malformed record")
+            continue
+        try:
+            batch.append((line, PostImport.model_validate(record)))
+        except ValidationError as error:
+            detail = "; ".join(
+                f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors()
+            )
+            _skip(result, line, detail)
+            continue
+        if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+            await _insert_post_batch(session=session, author=author, batch=batch, result=result)
+            batch = []
+    if batch:
+        await _insert_post_batch(session=session, author=author, batch=batch, result=result)
+    return result
+
+
+def _skip(result: BulkImportResult, line: int, detail: str) -> None:
+    result.skipped += 1
+    if len(result.errors) < settings.BULK_IMPORT_MAX_ERRORS:
+        result.errors.append(BulkImportError(line=line, detail=detail))
+
+
+async def _insert_post_batch(
+    *, session: Session, author: User, batch: list[tuple[int, PostImport]], result: BulkImportResult
+) -> None:
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "title": item.title,
+            "description": item.description,
+            "content": item.content,
+            "slug": slugify(item.title, allow_unicode=True, separator="_"),
+            "author_id": author.id,
+            "status": item.status,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for _, item in batch
+    ]
+    statement = pg_insert(Post).on_conflict_do_nothing(index_elements=["title"]).returning(Post.id)
+    inserted = set((await session.scalars(statement, rows)).all())
+
+    post_tags = {}
+    for row, (line, item) in zip(rows, batch):
+        if row["id"] in inserted:
+            post_tags[row["id"]] = normalize_tags(item.tags)
+        else:
+            _skip(result, line, "This title is already in use.")
+    tag_ids = await upsert_tags(
+        session=session, names=list(dict.fromkeys(name for names in post_tags.values() for name in names))
+    )
+    links = [
+        {"post_id": post_id, "tag_id": tag_ids[name]}
+        for post_id, names in post_tags.items()
+        for name in names
+    ]
+    if links:
+        await session.execute(pg_insert(PostTag).on_conflict_do_nothing(), links)
+    await session.commit()
+    result.created += len(inserted)
+
+
+EXPORT_FIELDS = ("id", "title", "description", "content", "tags", "status", "created_at", "author")
+
+
+def select_export_rows(*whereclauses: Any) -> Any:
+    """
+    Posts with their tag names and author nickname, oldest first.
+    """
+    return (
+        select(
+            Post.id,
+            Post.title,
+            Post.description,
+            Post.content,
+            func.array_remove(func.array_agg(Tag.name), None).label("tags"),
+            Post.status,
+            Post.created_at,
+            User.nickname.label("author"),
+        )
+        .join(User, User.id == Post.author_id)
+        .outerjoin(PostTag, PostTag.post_id == Post.id)
+        .outerjoin(Tag, Tag.id == PostTag.tag_id)
+        .where(*whereclauses)
+        .group_by(Post.id, User.nickname)
+        .order_by(Post.created_at, Post.id)
+    )
+
+
+async def export_posts(*, statement: Any, format: BulkFormat) -> AsyncIterator[str]:
+    """
+    Stream `select_export_rows` results as NDJSON or CSV through a server-side
+    cursor. Opens its own session, as the request's is closed by the time a
+    streaming response is sent.
+    """
+    async with StreamSessionLocal() as session:
+        result = await session.stream(
+            statement.execution_options(yield_per=settings.STREAM_BATCH_SIZE)
+        )
+        if format == BulkFormat.csv:
+            yield csv_line(EXPORT_FIELDS)
+        async for rows in result.mappings().partitions():
+            if format == BulkFormat.csv:
+                yield "".join(
+                    csv_line([",".join(row["tags"]) if field == "tags" else row[field] for field in EXPORT_FIELDS])
+                    for row in rows
+                )
+            else:
+                yield "".join(ndjson_line(dict(row)) for row in rows)
+
+
+async def post_create(*, session: Session, background_tasks: BackgroundTasks, current_user: CurrentUser, title: str, description: str, tags: list, file: UploadFile, content: str) -> Post:
+    """
+    Create a post and its tags in one transaction.
+
+    The unique title constraint rejects duplicates, so there is no lookup
+    beforehand. The upload is copied before any row is written, so the
+    transaction isn't held open during the copy; it is removed if the
+    post isn't created.
+    """
+    upload = await save_upload(file)
     post = Post(
         title=title, 
         description=description, 
         author_id=current_user.id, 
         slug=slugify(title, allow_unicode=True, separator="_"),
         content=content,
-        poster=poster
+        poster=None,
+        poster_status=PosterStatus.pending if upload else None,
     )       
-    
-    # Post image create
-    
-    # if fp:
-    #     image = Image(filename=fp, post_id=post.id)        
-    # else:
-    #     raise HTTPException(status_code=400, detail="Uploaded file is not a valid image")
-    
-    # Post tag create
-    tags = [item.strip() and ''.join(letter for letter in item if letter.isalnum()) for item in tags[0].split(',')]
-    for i in range(len(tags)):
-        tag = Tag(name=tags[i].lower(), post_id=post.id)
-        session.add(tag)
-    # session.add(image)
     session.add(post)
-    await session.commit()
+    try:
+        try:
+            await session.flush()
+        except IntegrityError:
+            await session.rollback()
+            raise HTTPException(status_code=400, detail="This title is already in use.")
+
+        tag_ids = await upsert_tags(session=session, names=normalize_tags(tags))
+        if tag_ids:
+            await session.execute(
+                insert(PostTag), [{"post_id": post.id, "tag_id": tag_id} for tag_id in tag_ids.values()]
+            )
+        await session.commit()
+    except BaseException:
+        discard_upload(upload)
+        raise
+    await cache.delete(f"post:slug:{post.slug}", *author_cache_keys(current_user.nickname))
 
+    if upload:
+        background_tasks.add_task(
+            process_post_poster, 
+            post_id=post.id, 
+            upload_path=upload.path, 
+            content_hash=upload.content_hash,
+        )
     return post
 
 
+async def process_post_poster(*, post_id: uuid.UUID, upload_path: str, content_hash: str) -> None:
+    """
+    Build the poster variants in the image worker pool and store them on the post.
+
+    Any failure, including a worker that died, marks the poster `failed`
+    instead of leaving it `pending`.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_image_executor()
+    try:
+        variants = await loop.run_in_executor(
+            executor, generate_poster_variants, upload_path, content_hash
+        )
+    except Exception as error:
+        logging.exception("Poster processing failed for post %s", post_id)
+        if isinstance(error, BrokenProcessPool):
+            # A broken pool rejects every later job; the next call starts a new one.
+            shutdown_image_executor(executor)
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+        variants = None
+    async with AsyncSessionLocal() as session:
+        post = await session.get(Post, post_id)
+        if not post:
+            return
+        if variants:
+            # Largest JPEG stays in `poster` for clients that ignore variants.
+            fallback = [variant for variant in variants if variant["format"] == "jpeg"] or variants
+            post.poster = max(fallback, key=lambda variant: variant["width"])["url"]
+            post.poster_variants = variants
+            post.poster_status = PosterStatus.ready
+        else:
+            post.poster_status = PosterStatus.failed
+        cache_keys = await post_cache_keys(session=session, post=post)
+        session.add(post)
+        await session.commit()
+        await cache.delete(*cache_keys)
+
+
 async def post_update(*, session: Session, current_post: Post, post_in: PostUpdate) -> Any:
     db_post = await get_post_by_title(session=session, title=post_in.title)    
     if db_post and current_post.id != db_post.id:
         raise HTTPException(status_code=400, detail="This title is already in use.")
     else:
+        cache_keys = await post_cache_keys(session=session, post=current_post)
         post_data = post_in.model_dump(exclude_unset=True)
         current_post.sqlmodel_update(post_data)
         session.add(current_post)
         await session.commit()
+        await cache.delete(*cache_keys)
         session.refresh(current_post)
         return current_post
\ No newline at end of file
@@ -0,0 +1,69 @@
+import logging
+from typing import Any
+from cachetools import TTLCache
+from sqlalchemy import func, text
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.post_model import Post
+from app.models.tag_model import Tag
+from app.models.user_model import User
+from app.schemas.search_schema import PostSuggestion, SuggestType
+
+# Hot prefixes repeat across keystrokes and users, so results are cached
+# briefly per (type, prefix, limit).
+_suggestions: TTLCache = TTLCache(
+    maxsize=settings.SUGGEST_CACHE_SIZE, ttl=settings.SUGGEST_CACHE_TTL
+)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _suggest_statement(suggest_type: SuggestType, prefix: str, limit: int) -> Any:
+    column = {
+        SuggestType.tag: Tag.name,
+        SuggestType.user: User.nickname,
+        SuggestType.post: Post.title,
+    }[suggest_type]
+    if suggest_type == SuggestType.post:
+        statement = select(Post.id, Post.title, Post.slug).where(Post.status == True)
+    else:
+        statement = select(column).where(column.is_not(None))
+    return (
+        statement
+        .where(column.ilike(_escape_like(prefix) + "%", escape="\\"))
+        .order_by(func.similarity(column, prefix).desc(), func.length(column), column)
+        .limit(limit)
+    )
+
+
+async def get_suggestions(
+    *, session: Session, suggest_type: SuggestType, prefix: str, limit: int
+) -> list[Any]:
+    """
+    Top matches starting with `prefix` (case-insensitive). Queries run under
+    SUGGEST_TIMEOUT_MS; a query that exceeds it returns no suggestions
+    rather than holding up the response.
+    """
+    key = (suggest_type, prefix.lower(), limit)
+    cached = _suggestions.get(key)
+    if cached is not None:
+        return cached
+    try:
+        async with session.begin_nested():
+            await session.execute(
+                text(f"SET LOCAL statement_timeout = {int(settings.SUGGEST_TIMEOUT_MS)}")
+            )
+            result = await session.execute(_suggest_statement(suggest_type, prefix, limit))
+    except DBAPIError:
+        logging.warning(f"Suggest query for {suggest_type.value} exceeded its budget")
+        return []
+    if suggest_type == SuggestType.post:
+        suggestions = [PostSuggestion.model_validate(row) for row in result.mappings()]
+    else:
+        suggestions = list(result.scalars())
+    _suggestions[key] = suggestions
+    return suggestions
@@ -1,20 +1,28 @@
-from typing import Any
+from typing import Any, AsyncIterator
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
-from app.core.security import get_password_hash, verify_password
+from app.core.config import settings
+from app.core.principal_cache import invalidate_principal
+from app.core.revocation import REVOKED, token_revocations
+from app.core.security import hash_password_async, verify_password_async
+from app.core.serialization import ndjson_lines
+from app.core.session import StreamSessionLocal
 from app.models.role_model import Role
 from app.models.user_model import User
-from app.schemas.user_schema import UserCreate, UserUpdate
+from app.schemas.user_schema import UserCreate, UserPublic, UserUpdate
 from app.schemas.role_schema import RoleCreate
 
 
 async def create_user(*, session: Session, user_create: UserCreate) -> User:
     db_role = await get_role(session=session, role="user")
+    hashed_password = await hash_password_async(user_create.password)
     db_obj = User.model_validate(
         user_create, 
         update={
-            "hashed_password": get_password_hash(user_create.password),
-            "role_id": db_role.id
+            "hashed_password": hashed_password,
+            "role_id": db_role.id,
+            "is_active": True,
         }
     )
     session.add(db_obj)
@@ -27,15 +35,83 @@ async def update_user(*, session: Session, current_user: User, user_in: UserUpda
     extra_data = {}
     if "password" in user_data:
         password = user_data["password"]
-        hashed_password = get_password_hash(password)
+        hashed_password = await hash_password_async(password)
         extra_data["hashed_password"] = hashed_password
+    # Changes to what the token claims carry invalidate issued tokens.
+    revoke = any(
+        key in user_data and user_data[key] != getattr(current_user, key)
+        for key in ("is_active", "is_superuser")
+    )
     current_user.sqlmodel_update(user_data, update=extra_data)
+    if revoke:
+        await revoke_tokens(session=session, user=current_user)
     session.add(current_user)
     await session.commit()
+    invalidate_principal(current_user.id)
+    if revoke:
+        publish_token_version(current_user)
     session.refresh(current_user)
     return current_user
 
 
+async def revoke_tokens(*, session: Session, user: User) -> None:
+    """
+    Invalidate the user's issued access tokens by bumping their version.
+
+    Call after role, superuser or active changes; the caller commits and
+    then calls publish_token_version.
+    """
+    user.token_version += 1
+    session.add(user)
+
+
+def publish_token_version(user: User) -> None:
+    """
+    Make this worker enforce the user's committed token version at once.
+
+    Only call after the commit succeeds: a version that never reached the
+    database would reject every token the user holds until the next refresh.
+    """
+    invalidate_principal(user.id)
+    token_revocations.set(user.id, user.token_version if user.is_active else REVOKED)
+
+
+async def get_token_claims(*, session: Session, user: User) -> dict[str, Any]:
+    """
+    Authorization claims for a stateless access token.
+    """
+    roles = (await session.scalars(select(Role.name).where(Role.user_id == user.id))).all()
+    token_revocations.set(user.id, user.token_version)
+    return {
+        "roles": list(roles),
+        "su": user.is_superuser,
+        "act": user.is_active,
+        "ver": user.token_version,
+    }
+
+
+async def load_roles(*, session: Session, user: User) -> User:
+    """
+    Load `user.roles` for responses that serialize them.
+    """
+    await session.refresh(user, ["roles"])
+    return user
+
+
+async def stream_users(*, statement: Any) -> AsyncIterator[bytes]:
+    """
+    Stream users with their roles as NDJSON through a server-side cursor,
+    in its own session.
+    """
+    statement = statement.options(selectinload(User.roles)).execution_options(
+        yield_per=settings.STREAM_BATCH_SIZE
+    )
+    async with StreamSessionLocal() as session:
+        result = await session.stream_scalars(statement)
+        async for users in result.partitions():
+            yield ndjson_lines(UserPublic, users)
+
+
 async def get_user_by_email(*, session: Session, email: str) -> User | None:  
     statement = select(User).where(User.email == email)
     session_user = await session.scalar(statement=statement)
@@ -52,7 +128,7 @@ async def authenticate(*, session: Session, email: str, password: str) -> User |
     db_user = await get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    if not await verify_password_async(password, db_user.hashed_password):
         return None
     return db_user
 
@@ -65,7 +141,12 @@ async def get_role(*, session: Session, role: str) -> Role | None:
 async def create_user_role(*, session, role_in: RoleCreate) -> Role:
     db_obj = Role.model_validate(role_in)
     session.add(db_obj)
+    user = await session.get(User, db_obj.user_id)
+    if user:
+        await revoke_tokens(session=session, user=user)
     await session.commit()
+    if user:
+        publish_token_version(user)
     return db_obj
 
 
@@ -1,5 +1,5 @@
 from sqlmodel import select
-from app.core.security import get_password_hash
+from app.core.security import hash_password_async
 from app.core.session import AsyncSessionLocal
 from app.core.config import settings
 from app.crud.user_crud import create_user_role, get_role
@@ -22,10 +22,11 @@ async def init_db():
                 email=settings.FIRST_SUPERUSER_EMAIL,
                 password=settings.FIRST_SUPERUSER_PASSWORD                
             )
+            hashed_password = await hash_password_async(user_in.password)
             user = User.model_validate(
                 user_in, 
                 update={
-                    "hashed_password": get_password_hash(user_in.password), 
+                    "hashed_password": hashed_password, 
                     'is_active': True, 
                     'is_superuser': True
                 }
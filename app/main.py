@@ -1,21 +1,35 @@
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 from app.api.api import api_router
 from app.init_data import init_db
+from app.core.mail import mail_outbox
+from app.core.revocation import token_revocations
+from app.core.middleware import QueryStatsMiddleware
+from app.core.security import shutdown_password_executor
+from app.core.static_files import UploadFiles
+from app.utils import precompile_email_templates, shutdown_image_executor
 from contextlib import asynccontextmanager
 
 
 # from app.api.main import api_router
-from app.core.config import settings
+from app.core.config import ModeEnum, settings
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("enter lifespan")
     await init_db()
+    precompile_email_templates()
+    if settings.EMAILS_ENABLED:
+        mail_outbox.start()
+    if settings.STATELESS_AUTH:
+        token_revocations.start()
     yield
+    await token_revocations.stop()
+    await mail_outbox.stop()
+    shutdown_password_executor()
+    shutdown_image_executor()
     print("exit lifespan")
     
 
@@ -25,6 +39,12 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+if settings.REQUEST_METRICS_ENABLED:
+    app.add_middleware(
+        QueryStatsMiddleware, 
+        expose_headers=settings.MODE == ModeEnum.development,
+    )
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -37,6 +57,6 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
-app.mount("/upload", StaticFiles(directory="upload", html=True), name="upload")
+app.mount(settings.UPLOAD_URL, UploadFiles(directory=settings.UPLOAD_PATH, html=True), name="upload")
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
\ No newline at end of file
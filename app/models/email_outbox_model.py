@@ -0,0 +1,31 @@
+import enum
+from datetime import datetime
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+from app.models.base_uuid_model import BaseUUIDModel
+
+
+class EmailStatus(str, enum.Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
+
+
+class EmailOutboxBase(SQLModel):
+    email_to: str
+    subject: str
+    html_content: str
+
+
+# Durable queue of outgoing emails, drained by app.core.mail.MailOutbox
+class EmailOutbox(BaseUUIDModel, EmailOutboxBase, table=True):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    status: EmailStatus = Field(default=EmailStatus.pending)
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    last_error: str | None = None
+    sent_at: datetime | None = None
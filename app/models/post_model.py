@@ -1,7 +1,19 @@
+import enum
 import uuid
+from sqlalchemy import Column, Computed, Index
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlmodel import Field, Relationship, SQLModel
+from app.core.config import settings
 from app.models.base_uuid_model import BaseUUIDModel
-from app.models.tag_model import Tag
+from app.models.tag_model import PostTag, Tag
+
+SEARCH_CONFIG = "english"
+
+class PosterStatus(str, enum.Enum):
+    pending = "pending"
+    ready = "ready"
+    failed = "failed"
+
 
 # Shared properties
 class PostBase(SQLModel):
@@ -12,15 +24,43 @@ class PostBase(SQLModel):
 
 # Database model, database table inferred from class name
 class Post(BaseUUIDModel, PostBase, table=True):  
+    __table_args__ = (
+        Index("ix_post_created_at_id", "created_at", "id"),
+        Index("ix_post_author_id_created_at_id", "author_id", "created_at", "id"),
+        Index(
+            "ix_post_title_trgm", 
+            "title", 
+            postgresql_using="gin", 
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
+
     title: str = Field(min_length=10, max_length=255, unique=True)
     description: str = Field(min_length=10, max_length=255)
     content: str | None = Field(min_length=10, max_length=255)    
     author_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
-    author: list["User"] | None = Relationship(back_populates="posts", sa_relationship_kwargs={'lazy': 'selectin'})     # type: ignore
+    author: list["User"] | None = Relationship(back_populates="posts", sa_relationship_kwargs={'lazy': settings.DATABASE_RELATIONSHIP_LAZY})     # type: ignore
     slug: str = Field(min_length=10, max_length=255)
     poster: str | None
-    tags: list[Tag] = Relationship(back_populates="post", cascade_delete=True, sa_relationship_kwargs={'lazy': 'selectin'}) 
+    poster_status: PosterStatus | None = None
+    poster_variants: list[dict] | None = Field(default=None, sa_column=Column(JSONB))
+    tags: list[Tag] = Relationship(back_populates="posts", link_model=PostTag, passive_deletes=True, sa_relationship_kwargs={'lazy': settings.DATABASE_RELATIONSHIP_LAZY}) 
     status: bool = Field(default=False)
-    
\ No newline at end of file
+
+
+# Weighted full-text document generated by Postgres. It is added to the table
+# but not mapped, so loading posts never pulls the tsvector.
+post_search_vector = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content, '')), 'C')",
+        persisted=True,
+    ),
+)
+Post.__table__.append_column(post_search_vector)
+Index("ix_post_search_vector", post_search_vector, postgresql_using="gin")
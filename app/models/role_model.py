@@ -1,6 +1,7 @@
 import uuid
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String
 from sqlmodel import Field, SQLModel, Relationship
+from app.core.config import settings
 from app.models.base_uuid_model import BaseUUIDModel
 
 
@@ -11,5 +12,7 @@ class RoleBase(SQLModel):
 
 
 class Role(BaseUUIDModel, RoleBase, table=True): 
+    __table_args__ = (Index("ix_role_created_at_id", "created_at", "id"),)
+
     user_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, ondelete="CASCADE")
-    user: list["User"] | None = Relationship(back_populates="roles", sa_relationship_kwargs={'lazy': 'selectin'})   # type: ignore
\ No newline at end of file
+    user: list["User"] | None = Relationship(back_populates="roles", sa_relationship_kwargs={'lazy': settings.DATABASE_RELATIONSHIP_LAZY})   # type: ignore
\ No newline at end of file
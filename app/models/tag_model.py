@@ -1,5 +1,7 @@
 import uuid
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
+from app.core.config import settings
 from app.models.base_uuid_model import BaseUUIDModel
 
 
@@ -8,12 +10,27 @@ class TagBase(SQLModel):
     name: str = Field(min_length=1, max_length=255)
 
 
+# Association table between posts and tags
+class PostTag(SQLModel, table=True):
+    __tablename__ = "post_tag"
+    __table_args__ = (Index("ix_post_tag_tag_id_post_id", "tag_id", "post_id"),)
+
+    post_id: uuid.UUID = Field(foreign_key="post.id", primary_key=True, ondelete="CASCADE")
+    tag_id: uuid.UUID = Field(foreign_key="tag.id", primary_key=True, ondelete="CASCADE")
+
+
 class Tag(BaseUUIDModel, TagBase, table=True):  
-    name: str 
-    post_id: uuid.UUID = Field(
-        foreign_key="post.id", nullable=False, ondelete="CASCADE"
+    __table_args__ = (
+        Index(
+            "ix_tag_name_trgm", 
+            "name", 
+            postgresql_using="gin", 
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
     )
-    post: list["Post"] | None = Relationship(back_populates="tags")  # type: ignore
+
+    name: str = Field(max_length=255, unique=True, index=True)
+    posts: list["Post"] = Relationship(back_populates="tags", link_model=PostTag, passive_deletes=True, sa_relationship_kwargs={'lazy': settings.DATABASE_RELATIONSHIP_LAZY})  # type: ignore
 
     def __repr__(self) -> str:
-        return f"<Tag {self.name}>"
\ No newline at end of file
+        return f"<Tag {self.name}>"
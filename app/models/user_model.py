@@ -2,9 +2,10 @@ import enum
 import uuid
 from pydantic import EmailStr
 
-from sqlalchemy import ARRAY, Column, String
+from sqlalchemy import ARRAY, Column, Index, String
 from sqlalchemy.dialects.postgresql import ENUM as Enum
 from sqlmodel import Field, Relationship, SQLModel
+from app.core.config import settings
 from app.models.base_uuid_model import BaseUUIDModel
 
 
@@ -25,6 +26,16 @@ class UserBase(SQLModel):
 
 # Database model, database table inferred from class name
 class User(BaseUUIDModel, UserBase, table=True):    
+    __table_args__ = (
+        Index("ix_user_created_at_id", "created_at", "id"),
+        Index(
+            "ix_user_nickname_trgm", 
+            "nickname", 
+            postgresql_using="gin", 
+            postgresql_ops={"nickname": "gin_trgm_ops"},
+        ),
+    )
+
     is_active: bool
     is_superuser: bool = False
     gender: Gender = Gender.other
@@ -35,8 +46,12 @@ class User(BaseUUIDModel, UserBase, table=True):
     picture: str | None = None
     phone: str | None = None
     hashed_password: str
-    posts: list["Post"] = Relationship(back_populates="author", cascade_delete=True) # type: ignore
-    roles: list["Role"] = Relationship(back_populates="user", cascade_delete=True, sa_relationship_kwargs={'lazy': 'selectin'}) # type: ignore
+    # Bumped to revoke issued access tokens, see app/core/revocation.py.
+    token_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Rows are removed by the ON DELETE CASCADE foreign keys, so deleting a
+    # user never loads these collections.
+    posts: list["Post"] = Relationship(back_populates="author", cascade_delete=True, passive_deletes=True, sa_relationship_kwargs={'lazy': settings.DATABASE_RELATIONSHIP_LAZY}) # type: ignore
+    roles: list["Role"] = Relationship(back_populates="user", cascade_delete=True, passive_deletes=True, sa_relationship_kwargs={'lazy': settings.DATABASE_RELATIONSHIP_LAZY}) # type: ignore
     gender: str
 
     def __str__(self):
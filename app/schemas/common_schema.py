@@ -11,6 +11,17 @@ class GenderEnum(str, Enum):
     other = "other"
 
 
+class CountMode(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+
+class BulkFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
 class MetaGeneral(SQLModel):
     roles: list[RoleRead]
 
@@ -40,6 +51,19 @@ class Token(SQLModel):
 # Contents of JWT token
 class TokenPayload(SQLModel):
     sub: str | None = None
+    # Stateless authorization claims, only in tokens issued with STATELESS_AUTH.
+    roles: list[str] | None = None
+    su: bool | None = None
+    act: bool | None = None
+    ver: int | None = None
+
+
+# Identity and permissions of the caller, from token claims or the user row
+class Principal(SQLModel):
+    id: uuid.UUID
+    is_active: bool
+    is_superuser: bool
+    roles: list[str] | None = None
 
 
 class NewPassword(SQLModel):
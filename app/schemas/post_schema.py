@@ -1,9 +1,10 @@
-from typing import Optional, Set
+from typing import Any, Optional, Set
 import uuid
+from pydantic import field_validator
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy import Column, String
 from sqlmodel import Field, Relationship, SQLModel
-from app.models.post_model import PostBase
+from app.models.post_model import PostBase, PosterStatus
 from app.models.tag_model import Tag
 from app.schemas.user_schema import UserPublic
 # from app.schemas.post_image_schema import ImagePublic
@@ -22,16 +23,72 @@ class PostUpdate(PostBase):
     content: str | None = Field(min_length=10, max_length=255)    
     
 
-# Properties to return via API, id is always required
-class PostPublic(PostBase):
+class PosterVariant(SQLModel):
+    url: str
+    width: int
+    height: int
+    format: str
+
+
+# Listing properties without the post body
+class PostSummary(PostBase):
     id: uuid.UUID
     created_at: datetime
     slug: str
-    content: str
-    poster: str
+    poster: str | None
+    poster_status: PosterStatus | None
+    poster_variants: list[PosterVariant] | None = None
     author: UserPublic
 
 
+# Properties to return via API, id is always required
+class PostPublic(PostSummary):
+    content: str
+
+
 class PostsPublic(SQLModel):
     data: list[PostPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
+
+
+class PostsSummary(SQLModel):
+    data: list[PostSummary]
+    count: int | None
+    next_cursor: str | None = None
+
+
+class PostSearchHit(PostPublic):
+    rank: float
+    snippet: str | None
+
+
+class PostSearchResults(SQLModel):
+    data: list[PostSearchHit]
+    next_cursor: str | None = None
+
+
+class PostImport(SQLModel):
+    title: str = Field(min_length=10, max_length=255)
+    description: str = Field(min_length=10, max_length=255)
+    # Required like the create form's: PostPublic serializes it as a str.
+    content: str = Field(min_length=10, max_length=255)
+    tags: list[str] = []
+    status: bool = False
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def split_tags(cls, value: Any) -> Any:
+        # CSV rows carry the tags as one comma separated string.
+        return [value] if isinstance(value, str) else value
+
+
+class BulkImportError(SQLModel):
+    line: int
+    detail: str
+
+
+class BulkImportResult(SQLModel):
+    created: int = 0
+    skipped: int = 0
+    errors: list[BulkImportError] = []
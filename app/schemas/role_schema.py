@@ -20,4 +20,5 @@ class RoleEnum(str, Enum):
 
 
 class RolesRead(SQLModel):
-    data: list[RoleRead]
\ No newline at end of file
+    data: list[RoleRead]
+    next_cursor: str | None = None
\ No newline at end of file
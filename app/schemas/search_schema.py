@@ -0,0 +1,21 @@
+import uuid
+from enum import Enum
+from sqlmodel import SQLModel
+
+
+class SuggestType(str, Enum):
+    tag = "tag"
+    user = "user"
+    post = "post"
+
+
+class PostSuggestion(SQLModel):
+    id: uuid.UUID
+    title: str
+    slug: str
+
+
+class Suggestions(SQLModel):
+    tags: list[str] = []
+    users: list[str] = []
+    posts: list[PostSuggestion] = []
@@ -15,7 +15,6 @@ class TagtUpdate(TagBase):
 # Properties to return via API, id is always required
 class TagPublic(TagBase):
     id: uuid.UUID
-    post_id: uuid.UUID
     name: str
 
 
@@ -25,12 +25,13 @@ class UserPublic(UserBase):
     country: str | None = None
     address: str | None = None
     picture: str | None = None
-    role: RoleRead
+    roles: list[RoleRead] = []
 
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
 
 
 # class UserStatus(str, Enum):
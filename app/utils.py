@@ -1,4 +1,9 @@
+import hashlib
 import logging
+import os
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
@@ -6,11 +11,27 @@ from typing import Any
 
 import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from jwt.exceptions import InvalidTokenError
 from PIL import Image 
 
-from app.core.config import settings
+from app.core.config import ModeEnum, settings
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+POSTER_EXTENSIONS = {"avif": ".avif", "webp": ".webp", "jpeg": ".jpg"}
+
+_image_executor: ProcessPoolExecutor | None = None
+
+# Templates are compiled once per process and kept in memory; compiled
+# bytecode is also cached on disk so new workers skip the parse step.
+email_templates_env = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "email-templates"),
+    bytecode_cache=FileSystemBytecodeCache(settings.EMAIL_TEMPLATES_CACHE_DIR),
+    auto_reload=settings.MODE == ModeEnum.development,
+)
 
 
 @dataclass
@@ -19,14 +40,23 @@ class EmailData:
     subject: str
 
 
+@dataclass
+class SavedUpload:
+    path: str
+    content_hash: str
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
+    template = email_templates_env.get_template(template_name)
+    html_content = template.render(context)
     return html_content
 
 
+def precompile_email_templates() -> None:
+    for template_name in email_templates_env.list_templates():
+        email_templates_env.get_template(template_name)
+
+
 def send_email(
     *,
     email_to: str,
@@ -118,15 +148,106 @@ def verify_password_reset_token(token: str) -> str | None:
         return None
     
 
-def thumbnail_post_image(file, email: str):
+def get_image_executor() -> ProcessPoolExecutor:
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _image_executor
+
+
+def shutdown_image_executor(executor: ProcessPoolExecutor | None = None) -> None:
+    """
+    Shut down the image worker pool, or only `executor` if it is still the current one.
+    """
+    global _image_executor
+    if _image_executor is not None and executor in (None, _image_executor):
+        _image_executor.shutdown(wait=False, cancel_futures=True)
+        _image_executor = None
+
+
+def _copy_upload(file, file_path: str) -> str:
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    file.seek(0)
+    digest = hashlib.sha256()
+    with open(file_path, "wb") as destination:
+        while chunk := file.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            destination.write(chunk)
+    return digest.hexdigest()
+
+
+async def save_upload(file: UploadFile) -> SavedUpload | None:
+    """
+    Copy the raw upload to UPLOAD_PATH/tmp in chunks, hashing it on the way.
+    """
+    if not file.size:
+        return None
+    file_path = os.path.join(settings.UPLOAD_PATH, "tmp", uuid.uuid4().hex)
+    content_hash = await run_in_threadpool(_copy_upload, file.file, file_path)
+    return SavedUpload(path=file_path, content_hash=content_hash)
+
+
+def discard_upload(upload: SavedUpload | None) -> None:
+    """
+    Remove a saved upload that won't be processed.
+    """
+    if upload and os.path.exists(upload.path):
+        os.remove(upload.path)
+
+
+def poster_formats() -> list[str]:
+    """
+    Configured poster formats this Pillow build can encode.
+    """
+    extensions = Image.registered_extensions()
+    return [
+        image_format for image_format in settings.POSTER_FORMATS
+        if extensions.get(POSTER_EXTENSIONS.get(image_format, "")) in Image.SAVE
+    ]
+
+
+def generate_poster_variants(upload_path: str, content_hash: str) -> list[dict] | None:
+    """
+    Encode the upload at each POSTER_WIDTHS width (never upscaled) in every
+    supported format. Files are named by content hash, so identical uploads
+    reuse the variants already on disk. Runs in the image worker pool and
+    removes the raw upload when done.
+    """
+    poster_dir = os.path.join(settings.UPLOAD_PATH, "posters")
+    os.makedirs(poster_dir, exist_ok=True)
+    variants = []
     try:
-        img = Image.open(file.file)
-    except:
-        return None   
-    img.thumbnail(settings.IMAGE_SIZE)
-    file_path = settings.UPLOAD_PATH + "/" + email + "_" + settings.DATESTAMP + "." + img.format
-    img.save(file_path)
-    return file_path
+        img = Image.open(upload_path)
+        width, height = img.size
+        widths = sorted({min(size, width) for size in settings.POSTER_WIDTHS})
+        for image_format in poster_formats():
+            for variant_width in widths:
+                variant_height = max(1, round(height * variant_width / width))
+                file_name = f"{content_hash}_{variant_width}{POSTER_EXTENSIONS[image_format]}"
+                file_path = os.path.join(poster_dir, file_name)
+                if not os.path.exists(file_path):
+                    variant = img.resize((variant_width, variant_height), Image.LANCZOS)
+                    if image_format == "jpeg" and variant.mode not in ("RGB", "L"):
+                        variant = variant.convert("RGB")
+                    # Write under a temporary name so readers never see a partial file.
+                    tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+                    variant.save(tmp_path, format=image_format.upper(), quality=settings.POSTER_QUALITY)
+                    os.replace(tmp_path, file_path)
+                variants.append({
+                    "url": f"{settings.UPLOAD_URL.rstrip('/')}/posters/{file_name}",
+                    "width": variant_width,
+                    "height": variant_height,
+                    "format": image_format,
+                })
+    except Exception:
+        # DecompressionBombError, truncated or unsupported images and encoder
+        # errors all leave the post without a poster.
+        logging.exception("Could not build poster variants from %s", upload_path)
+        return None
+    finally:
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+    return variants
 
 
 # Remove all spaces
@@ -0,0 +1,53 @@
+"""
+Per-render cost of the password reset and new account emails, before (read
+the file and compile a new Template on every call) and after (cached Jinja
+environment). Uses app/email-templates when it has been built, otherwise
+the stand-ins in benchmarks/email-templates.
+
+    python -m benchmarks.bench_email_templates
+"""
+import timeit
+from pathlib import Path
+
+from jinja2 import FileSystemLoader, Template
+
+from app import utils
+
+TEMPLATES_DIR = Path(utils.__file__).parent / "email-templates"
+if not TEMPLATES_DIR.is_dir():
+    TEMPLATES_DIR = Path(__file__).parent / "email-templates"
+    utils.email_templates_env.loader = FileSystemLoader(TEMPLATES_DIR)
+
+
+def render_uncached(*, template_name: str, context: dict) -> str:
+    template_str = (TEMPLATES_DIR / template_name).read_text()
+    return Template(template_str).render(context)
+
+
+def bench(label: str, func, number: int) -> None:
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{label:<45} {seconds * 1e6:10.1f} us/render")
+
+
+def main(number: int = 2000) -> None:
+    utils.precompile_email_templates()
+    cases = {
+        "generate_reset_password_email": lambda: utils.generate_reset_password_email(
+            email_to="reader@example.com", email="reader@example.com", token="t" * 160
+        ),
+        "generate_new_account_email": lambda: utils.generate_new_account_email(
+            email_to="reader@example.com", username="reader", password="s3cret-passw0rd"
+        ),
+    }
+    for name, generate in cases.items():
+        render_email_template = utils.render_email_template
+        utils.render_email_template = render_uncached
+        try:
+            bench(f"{name} before", generate, number)
+        finally:
+            utils.render_email_template = render_email_template
+        bench(f"{name} after", generate, number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Cost of creating a post with 20 tags, half of them new, before (title
+lookup, per-tag ORM inserts, relationship assignment) and after
+(post_crud.post_create: flush, one tag upsert, one post_tag insert).
+
+Runs against the configured database as FIRST_SUPERUSER and removes the
+posts and tags it creates.
+
+    python -m benchmarks.bench_post_create
+"""
+import asyncio
+import io
+import time
+import uuid
+
+from fastapi import BackgroundTasks, UploadFile
+from slugify import slugify
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.core.instrumentation import track_queries
+from app.core.session import AsyncSessionLocal
+from app.crud import post_crud
+from app.models.post_model import Post
+from app.models.tag_model import Tag
+from app.models.user_model import User
+
+TAG_PREFIX = "benchcreate"
+TAGS_PER_POST = 20
+
+
+def tag_input(run: str, index: int) -> list[str]:
+    # Ten tags shared by every post and ten new ones, as one form field.
+    shared = [f"{TAG_PREFIX}shared{number}" for number in range(TAGS_PER_POST // 2)]
+    new = [f"{TAG_PREFIX}{run}x{index}x{number}" for number in range(TAGS_PER_POST // 2)]
+    return [", ".join(shared + new)]
+
+
+async def create_before(session, author: User, title: str, tags: list[str]) -> None:
+    if await session.scalar(select(Post).where(Post.title == title)):
+        raise RuntimeError("duplicate title")
+    names = [
+        "".join(letter for letter in item if letter.isalnum()).lower()
+        for item in tags[0].split(",")
+    ]
+    names = list(dict.fromkeys(name for name in names if name))
+    existing = {tag.name: tag for tag in await session.scalars(select(Tag).where(Tag.name.in_(names)))}
+    post = Post(
+        title=title,
+        description="Benchmark post description",
+        author_id=author.id,
+        slug=slugify(title, allow_unicode=True, separator="_"),
+        content="Benchmark post content",
+        poster=None,
+    )
+    post.tags = [existing.get(name) or Tag(name=name) for name in names]
+    session.add(post)
+    await session.commit()
+
+
+async def create_after(session, author: User, title: str, tags: list[str]) -> None:
+    await post_crud.post_create(
+        session=session,
+        background_tasks=BackgroundTasks(),
+        current_user=author,
+        title=title,
+        description="Benchmark post description",
+        tags=tags,
+        file=UploadFile(io.BytesIO(), size=0, filename="empty"),
+        content="Benchmark post content",
+    )
+
+
+async def bench(label: str, create, author: User, number: int) -> None:
+    run = uuid.uuid4().hex[:8]
+    timings, queries = [], 0
+    for index in range(number):
+        async with AsyncSessionLocal() as session:
+            title = f"Benchmark {label} post {run} {index}"
+            with track_queries() as stats:
+                started = time.perf_counter()
+                await create(session, author, title, tag_input(run, index))
+                timings.append((time.perf_counter() - started) * 1000)
+            queries += stats.count
+    timings.sort()
+    print(
+        f"{label:<8} {sum(timings) / number:8.2f} ms/post  p95 {timings[int(number * 0.95) - 1]:8.2f} ms"
+        f"  {queries / number:5.1f} queries/post"
+    )
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(Post).where(Post.title.like("Benchmark before post %")))
+        await session.execute(delete(Post).where(Post.title.like("Benchmark after post %")))
+        await session.execute(delete(Tag).where(Tag.name.like(f"{TAG_PREFIX}%")))
+        await session.commit()
+
+
+async def main(number: int = 200) -> None:
+    async with AsyncSessionLocal() as session:
+        author = await session.scalar(select(User).where(User.email == settings.FIRST_SUPERUSER_EMAIL))
+    try:
+        await bench("before", create_before, author, number)
+        await bench("after", create_after, author, number)
+    finally:
+        await cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
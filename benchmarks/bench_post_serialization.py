@@ -0,0 +1,78 @@
+"""
+Serialization cost of a /post/all page of 100 and 1000 rows: FastAPI's
+response_model path versus the fast path used with FAST_JSON_RESPONSES.
+
+    python -m benchmarks.bench_post_serialization
+"""
+import json
+import timeit
+import uuid
+from datetime import datetime
+
+from app.core.serialization import fast_json_response, get_type_adapter
+from app.models.post_model import Post
+from app.models.role_model import Role
+from app.models.user_model import User
+from app.schemas.post_schema import PostsPublic
+
+
+def make_posts(rows: int) -> list[Post]:
+    authors = []
+    for index in range(20):
+        author = User(
+            id=uuid.uuid4(),
+            nickname=f"author{index}",
+            first_name="Ada",
+            last_name="Lovelace",
+            email=f"author{index}@example.com",
+            is_active=True,
+            gender="Other",
+            hashed_password="x",
+        )
+        author.roles = [
+            Role(name="author", description="Role for author", user_id=author.id)
+        ]
+        authors.append(author)
+    return [
+        Post(
+            id=uuid.uuid4(),
+            title=f"Benchmark post number {index}",
+            description="A post used to measure list serialization",
+            content="Lorem ipsum dolor sit amet " * 8,
+            slug=f"benchmark_post_number_{index}",
+            poster=f"upload/posters/{index:064x}_1200.jpg",
+            author_id=authors[index % 20].id,
+            author=authors[index % 20],
+            created_at=datetime.utcnow(),
+        )
+        for index in range(rows)
+    ]
+
+
+def response_model_path(posts: list[Post]) -> bytes:
+    # What FastAPI does with a returned model: dump it, validate the dict
+    # against response_model, serialize in JSON mode and json.dumps it.
+    content = PostsPublic(data=posts, count=len(posts)).model_dump(by_alias=True)
+    adapter = get_type_adapter(PostsPublic)
+    value = adapter.validate_python(content, from_attributes=True)
+    data = adapter.dump_python(value, mode="json")
+    return json.dumps(
+        data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_path(posts: list[Post]) -> bytes:
+    return fast_json_response(PostsPublic, {"data": posts, "count": len(posts)}).body
+
+
+def main() -> None:
+    for rows in (100, 1000):
+        posts = make_posts(rows)
+        number = max(1, 5000 // rows)
+        for label, func in (("response_model", response_model_path), ("fast", fast_path)):
+            seconds = min(timeit.repeat(lambda: func(posts), number=number, repeat=5)) / number
+            print(f"{rows:>5} rows  {label:<15} {seconds * 1000:8.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Load test against a running server, with the same routers as benchmarks.run.
+Requires locust (not part of requirements.txt) and data from benchmarks.seed.
+
+    locust -f benchmarks/locustfile.py --host http://localhost:8000 \
+        --users 200 --spawn-rate 20 --run-time 5m --headless --csv results/load
+
+Each simulated user logs in as one of the seeded users; a small share of
+them log in as FIRST_SUPERUSER for the admin-only routes.
+"""
+import os
+import random
+
+from locust import HttpUser, between, task
+
+API = os.environ.get("API_V1_STR", "/api/v1")
+SEED_DOMAIN = "bench.example.com"
+SEED_PASSWORD = "benchmark-password"
+SEEDED_USERS = int(os.environ.get("SEEDED_USERS", "1000"))
+SUPERUSER_SHARE = float(os.environ.get("SUPERUSER_SHARE", "0.05"))
+
+
+class ApiUser(HttpUser):
+    wait_time = between(0.1, 1)
+
+    def on_start(self) -> None:
+        self.superuser = random.random() < SUPERUSER_SHARE
+        if self.superuser:
+            username = os.environ["FIRST_SUPERUSER_EMAIL"]
+            password = os.environ["FIRST_SUPERUSER_PASSWORD"]
+        else:
+            username = f"user{random.randrange(SEEDED_USERS)}@{SEED_DOMAIN}"
+            password = SEED_PASSWORD
+        response = self.client.post(
+            f"{API}/auth/access-token",
+            data={"username": username, "password": password},
+            name="auth.login",
+        )
+        response.raise_for_status()
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        posts = self.client.get(f"{API}/post/all?limit=100&count=none", name="posts.all").json()
+        self.posts = posts["data"] or []
+
+    def sample_post(self) -> dict | None:
+        return random.choice(self.posts) if self.posts else None
+
+    @task(10)
+    def list_posts(self) -> None:
+        self.client.get(f"{API}/post/all?limit=20", name="posts.all")
+
+    @task(5)
+    def list_post_summaries(self) -> None:
+        self.client.get(f"{API}/post/all?limit=20&summary=true&count=none", name="posts.all_summary")
+
+    @task(8)
+    def read_post_by_slug(self) -> None:
+        post = self.sample_post()
+        if post:
+            self.client.get(f"{API}/post/slug/{post['slug']}", name="posts.by_slug")
+
+    @task(4)
+    def read_posts_by_author(self) -> None:
+        post = self.sample_post()
+        if post and post["author"]["nickname"]:
+            self.client.get(f"{API}/post/author/{post['author']['nickname']}", name="posts.by_author")
+
+    @task(3)
+    def search_posts(self) -> None:
+        post = self.sample_post()
+        if post:
+            word = post["title"].split()[0]
+            self.client.get(f"{API}/post/search", params={"q": word}, name="posts.search")
+
+    @task(3)
+    def suggest(self) -> None:
+        post = self.sample_post()
+        if post:
+            self.client.get(f"{API}/search/suggest", params={"q": post["title"][:3]}, name="search.suggest")
+
+    @task(3)
+    def read_me(self) -> None:
+        self.client.get(f"{API}/user/me", name="users.me")
+
+    @task(1)
+    def list_users(self) -> None:
+        if self.superuser:
+            self.client.get(f"{API}/user/?limit=50", name="users.list")
+
+    @task(1)
+    def list_roles(self) -> None:
+        if self.superuser:
+            self.client.get(f"{API}/role/", name="roles.list")
@@ -0,0 +1,99 @@
+"""
+Query budget per read route, to catch N+1 regressions now that relationships
+raise instead of lazy loading. Runs the app in-process against the configured
+database, logged in as FIRST_SUPERUSER, and exits non-zero when a route runs
+more statements than its budget. Needs at least one published post.
+tests/test_query_budgets.py checks the same budgets against SQLite, along
+with budgets for the write routes.
+
+    python -m benchmarks.query_budgets
+"""
+import asyncio
+import sys
+
+import httpx
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.instrumentation import track_queries
+from app.core.principal_cache import clear_principals
+from app.core.session import AsyncSessionLocal
+from app.main import app
+from app.models.post_model import Post
+from app.models.tag_model import PostTag, Tag
+from app.models.user_model import User
+
+# Maximum statements per request with cold caches, authentication included.
+# Warm response and count caches only lower the numbers.
+BUDGETS = {
+    "/user/me": 3,
+    "/user/": 4,
+    "/role/": 2,
+    "/post/all": 4,
+    "/post/all?summary=true": 4,
+    "/post/self": 4,
+    "/post/{id}": 3,
+    "/post/slug/{slug}": 3,
+    "/post/author/{nickname}": 5,
+    "/post/tag/{tag}": 4,
+    "/post/search?q={word}": 3,
+    "/search/suggest?q={prefix}": 13,
+}
+
+
+async def sample_values() -> dict[str, str]:
+    async with AsyncSessionLocal() as session:
+        post, nickname = (
+            await session.execute(
+                select(Post, User.nickname)
+                .join(User, User.id == Post.author_id)
+                .where(Post.status == True)
+                .limit(1)
+            )
+        ).one()
+        tag = await session.scalar(
+            select(Tag.name).join(PostTag, PostTag.tag_id == Tag.id).limit(1)
+        )
+    return {
+        "id": str(post.id),
+        "slug": post.slug,
+        "nickname": nickname,
+        "tag": tag or "python",
+        "word": post.title.split()[0],
+        "prefix": post.title[:3],
+    }
+
+
+async def main() -> int:
+    failures = 0
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url=f"http://test{settings.API_V1_STR}"
+        ) as client:
+            response = await client.post(
+                "/auth/access-token",
+                data={
+                    "username": settings.FIRST_SUPERUSER_EMAIL,
+                    "password": settings.FIRST_SUPERUSER_PASSWORD,
+                },
+            )
+            response.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+            values = await sample_values()
+
+            for route, budget in BUDGETS.items():
+                clear_principals()
+                with track_queries() as stats:
+                    response = await client.get(route.format(**values))
+                ok = response.status_code == 200 and stats.count <= budget
+                failures += not ok
+                print(f"{'ok' if ok else 'FAIL':<5} {route:<30} {response.status_code} {stats.count:>3}/{budget} queries")
+                if not ok:
+                    for statement in stats.statements:
+                        print(f"        {' '.join(statement.split())[:160]}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
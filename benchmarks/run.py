@@ -0,0 +1,169 @@
+"""
+Run the API scenarios in-process and report latency percentiles and
+throughput, optionally against a saved baseline.
+
+The app runs behind httpx's ASGI transport with its lifespan, against the
+database configured in .env, seeded with `python -m benchmarks.seed`. Each
+scenario is warmed up, then `--requests` requests are sent by `--concurrency`
+concurrent clients. Response caches stay warm between requests, as they are
+in production.
+
+    python -m benchmarks.run --router posts
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.2
+
+With --baseline the run exits non-zero when a scenario's p95 grows, or its
+throughput drops, by more than the tolerance.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from app.core.config import settings
+from app.main import app
+from benchmarks.scenarios import SCENARIOS, Scenario, sample_values
+from benchmarks.seed import SEED_PASSWORD, seed_email
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> dict[str, str]:
+    response = await client.post(
+        "/auth/access-token", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def summarize(latencies_ms: list[float], elapsed: float, errors: int) -> dict[str, float]:
+    percentiles = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "p50_ms": round(percentiles[49], 3),
+        "p95_ms": round(percentiles[94], 3),
+        "p99_ms": round(percentiles[98], 3),
+        "max_ms": round(max(latencies_ms), 3),
+        "throughput_rps": round(len(latencies_ms) / elapsed, 1),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    *,
+    path: str,
+    headers: dict[str, str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> dict[str, float]:
+    async def send() -> tuple[float, bool]:
+        started = time.perf_counter()
+        response = await client.request(
+            scenario.method, path, headers=headers, data=scenario.form or None
+        )
+        return (time.perf_counter() - started) * 1000, response.is_success
+
+    for _ in range(warmup):
+        await send()
+
+    latencies_ms: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            latency_ms, ok = await send()
+            latencies_ms.append(latency_ms)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies_ms, time.perf_counter() - started, errors)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {result['p95_ms']} ms")
+        if result["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {before['throughput_rps']} -> {result['throughput_rps']} rps"
+            )
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    scenarios = [
+        scenario for scenario in SCENARIOS
+        if not args.router or scenario.router in args.router
+    ]
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url=f"http://bench{settings.API_V1_STR}"
+        ) as client:
+            values = await sample_values()
+            auth_headers = {
+                None: {},
+                "user": await login(client, seed_email(0), SEED_PASSWORD),
+                "superuser": await login(
+                    client, settings.FIRST_SUPERUSER_EMAIL, settings.FIRST_SUPERUSER_PASSWORD
+                ),
+            }
+            print(f"{'scenario':<28} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9} {'errors':>7}")
+            for scenario in scenarios:
+                name = f"{scenario.router}.{scenario.name}"
+                result = await run_scenario(
+                    client,
+                    scenario,
+                    path=scenario.path.format(**values),
+                    headers=auth_headers[scenario.auth],
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                    warmup=args.warmup,
+                )
+                results[name] = result
+                print(
+                    f"{name:<28} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                    f"{result['p99_ms']:>9.2f} {result['throughput_rps']:>9.1f} {result['errors']:>7}"
+                )
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print(f"Saved baseline to {args.save_baseline}")
+    failed = any(result["errors"] for result in results.values())
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the API routers in-process.")
+    parser.add_argument("--router", action="append", help="only run this router, repeatable")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--baseline", type=Path, help="fail on regressions against this file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--save-baseline", type=Path, help="write the results to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
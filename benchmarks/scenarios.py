@@ -0,0 +1,77 @@
+"""
+Request scenarios for the API benchmarks, one group per router in
+app/api/routes. Paths are formatted with the values from `sample_values`.
+"""
+from dataclasses import dataclass, field
+
+from sqlmodel import select
+
+from app.core.pagination import encode_cursor
+from app.core.session import AsyncSessionLocal
+from app.models.post_model import Post
+from app.models.tag_model import PostTag, Tag
+from app.models.user_model import User
+from benchmarks.seed import SEED_DOMAIN, SEED_PASSWORD, seed_email
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    router: str
+    method: str
+    path: str
+    # "user" for a seeded user, "superuser" for FIRST_SUPERUSER, None for anonymous.
+    auth: str | None = "user"
+    form: dict[str, str] = field(default_factory=dict)
+
+
+SCENARIOS = (
+    Scenario("login", "auth", "POST", "/auth/access-token", auth=None, form={
+        "username": seed_email(0), "password": SEED_PASSWORD,
+    }),
+    Scenario("me", "users", "GET", "/user/me"),
+    Scenario("list", "users", "GET", "/user/?limit=50", auth="superuser"),
+    Scenario("list_no_count", "users", "GET", "/user/?limit=50&count=none", auth="superuser"),
+    Scenario("by_id", "users", "GET", "/user/{user_id}", auth="superuser"),
+    Scenario("all", "posts", "GET", "/post/all?limit=20"),
+    Scenario("all_summary", "posts", "GET", "/post/all?limit=20&summary=true&count=none"),
+    Scenario("all_cursor", "posts", "GET", "/post/all?limit=20&count=none&cursor={post_cursor}"),
+    Scenario("self", "posts", "GET", "/post/self?limit=20"),
+    Scenario("by_id", "posts", "GET", "/post/{post_id}"),
+    Scenario("by_slug", "posts", "GET", "/post/slug/{slug}"),
+    Scenario("by_author", "posts", "GET", "/post/author/{nickname}"),
+    Scenario("by_tag", "posts", "GET", "/post/tag/{tag}?limit=20"),
+    Scenario("search", "posts", "GET", "/post/search?q={word}"),
+    Scenario("list", "roles", "GET", "/role/", auth="superuser"),
+    Scenario("suggest", "search", "GET", "/search/suggest?q={prefix}"),
+    Scenario("pool", "monitoring", "GET", "/monitoring/pool", auth="superuser"),
+)
+
+
+async def sample_values() -> dict[str, str]:
+    """
+    Ids, slugs and names from the seeded data to fill the scenario paths.
+    """
+    async with AsyncSessionLocal() as session:
+        user = await session.scalar(select(User).where(User.email == seed_email(0)))
+        if user is None:
+            raise SystemExit(f"No users @{SEED_DOMAIN} found, run python -m benchmarks.seed first")
+        post = await session.scalar(
+            select(Post)
+            .where(Post.author_id == user.id, Post.status == True)
+            .order_by(Post.created_at, Post.id)
+            .limit(1)
+        )
+        tag = await session.scalar(
+            select(Tag.name).join(PostTag, PostTag.tag_id == Tag.id).where(PostTag.post_id == post.id)
+        )
+    return {
+        "user_id": str(user.id),
+        "nickname": user.nickname,
+        "post_id": str(post.id),
+        "post_cursor": encode_cursor(post.created_at.isoformat(), post.id),
+        "slug": post.slug,
+        "tag": tag,
+        "word": post.title.split()[0].lower(),
+        "prefix": post.title[:3].lower(),
+    }
@@ -0,0 +1,144 @@
+"""
+Seed the configured database with benchmark users, tags and published posts.
+
+Seeded users share the SEED_DOMAIN email domain and SEED_PASSWORD, so the
+benchmarks can log in as any of them, and --reset removes them (their posts
+go with them through ON DELETE CASCADE). The data is generated from a fixed
+random seed, so two runs with the same arguments produce the same shape.
+
+    python -m benchmarks.seed --users 1000 --posts-per-user 20 --tags 200
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select
+
+from app.core.security import pwd_context
+from app.core.session import AsyncSessionLocal
+from app.models.post_model import Post
+from app.models.tag_model import PostTag, Tag
+from app.models.user_model import User
+
+SEED_DOMAIN = "bench.example.com"
+SEED_PASSWORD = "benchmark-password"
+TAG_PREFIX = "benchtag"
+BATCH_SIZE = 1000
+
+WORDS = (
+    "async database python fastapi postgres index cache query latency "
+    "stream cursor replica search token session worker queue schema "
+    "migration pool vector upload poster template release benchmark"
+).split()
+
+
+def seed_email(index: int) -> str:
+    return f"user{index}@{SEED_DOMAIN}"
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+async def reset() -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(User).where(User.email.like(f"%@{SEED_DOMAIN}")))
+        await session.execute(delete(Tag).where(Tag.name.like(f"{TAG_PREFIX}%")))
+        await session.commit()
+
+
+async def seed(*, users: int, posts_per_user: int, tags: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    async with AsyncSessionLocal() as session:
+        existing = await session.scalar(
+            select(func.count()).select_from(User).where(User.email.like(f"%@{SEED_DOMAIN}"))
+        )
+        if existing:
+            print(f"{existing} benchmark users already seeded, use --reset to reseed")
+            return
+
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        hashed_password = pwd_context.hash(SEED_PASSWORD)
+        user_rows = [
+            {
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+                "nickname": f"benchuser{index}",
+                "first_name": "Bench",
+                "last_name": f"User{index}",
+                "email": seed_email(index),
+                "is_active": True,
+                "is_superuser": False,
+                "gender": "Other",
+                "hashed_password": hashed_password,
+                "created_at": now - timedelta(days=365) + timedelta(minutes=index),
+                "updated_at": now,
+            }
+            for index in range(users)
+        ]
+        for offset in range(0, len(user_rows), BATCH_SIZE):
+            await session.execute(insert(User), user_rows[offset:offset + BATCH_SIZE])
+
+        tag_rows = [
+            {
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+                "name": f"{TAG_PREFIX}{index}",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for index in range(tags)
+        ]
+        if tag_rows:
+            await session.execute(insert(Tag), tag_rows)
+
+        post_rows, post_tag_rows = [], []
+        for index in range(users * posts_per_user):
+            post_id = uuid.UUID(int=rng.getrandbits(128))
+            title = f"{sentence(rng, 4)} {index}"
+            post_rows.append({
+                "id": post_id,
+                "title": title,
+                "description": sentence(rng, 12),
+                "content": sentence(rng, 30),
+                "slug": title.lower().replace(" ", "_"),
+                "author_id": user_rows[index % users]["id"],
+                "status": rng.random() < 0.9,
+                "created_at": now - timedelta(seconds=index),
+                "updated_at": now,
+            })
+            for tag in rng.sample(tag_rows, min(3, len(tag_rows))):
+                post_tag_rows.append({"post_id": post_id, "tag_id": tag["id"]})
+        for offset in range(0, len(post_rows), BATCH_SIZE):
+            await session.execute(insert(Post), post_rows[offset:offset + BATCH_SIZE])
+        for offset in range(0, len(post_tag_rows), BATCH_SIZE):
+            await session.execute(insert(PostTag), post_tag_rows[offset:offset + BATCH_SIZE])
+        await session.commit()
+
+    print(
+        f"Seeded {users} users, {tags} tags and {len(post_rows)} posts "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts-per-user", type=int, default=20)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="remove seeded data first")
+    args = parser.parse_args()
+
+    async def run() -> None:
+        if args.reset:
+            await reset()
+        await seed(users=args.users, posts_per_user=args.posts_per_user, tags=args.tags, seed=args.seed)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
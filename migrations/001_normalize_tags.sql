@@ -0,0 +1,32 @@
+-- Move from one tag row per (name, post) to a unique tag table plus a
+-- post_tag association table. Tag names are lowercased and deduplicated,
+-- keeping the oldest row for each name.
+BEGIN;
+
+CREATE TABLE post_tag (
+    post_id uuid NOT NULL REFERENCES post (id) ON DELETE CASCADE,
+    tag_id uuid NOT NULL,
+    PRIMARY KEY (post_id, tag_id)
+);
+
+CREATE TEMPORARY TABLE tag_canonical ON COMMIT DROP AS
+SELECT DISTINCT ON (lower(name)) id, lower(name) AS name
+FROM tag
+ORDER BY lower(name), created_at, id;
+
+INSERT INTO post_tag (post_id, tag_id)
+SELECT DISTINCT tag.post_id, tag_canonical.id
+FROM tag
+JOIN tag_canonical ON tag_canonical.name = lower(tag.name);
+
+DELETE FROM tag WHERE id NOT IN (SELECT id FROM tag_canonical);
+UPDATE tag SET name = lower(name);
+ALTER TABLE tag DROP COLUMN post_id;
+
+CREATE UNIQUE INDEX ix_tag_name ON tag (name);
+ALTER TABLE post_tag
+    ADD CONSTRAINT post_tag_tag_id_fkey
+    FOREIGN KEY (tag_id) REFERENCES tag (id) ON DELETE CASCADE;
+CREATE INDEX ix_post_tag_tag_id_post_id ON post_tag (tag_id, post_id);
+
+COMMIT;
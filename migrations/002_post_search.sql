@@ -0,0 +1,9 @@
+-- Generated full-text search document for posts and its GIN index.
+-- Keep the expression in sync with post_search_vector in app/models/post_model.py.
+ALTER TABLE post ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(content, '')), 'C')
+) STORED;
+
+CREATE INDEX CONCURRENTLY ix_post_search_vector ON post USING gin (search_vector);
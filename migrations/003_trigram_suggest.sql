@@ -0,0 +1,6 @@
+-- Trigram indexes backing /search/suggest prefix lookups.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY ix_user_nickname_trgm ON "user" USING gin (nickname gin_trgm_ops);
+CREATE INDEX CONCURRENTLY ix_post_title_trgm ON post USING gin (title gin_trgm_ops);
+CREATE INDEX CONCURRENTLY ix_tag_name_trgm ON tag USING gin (name gin_trgm_ops);
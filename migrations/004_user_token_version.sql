@@ -0,0 +1,2 @@
+-- Access token version, bumped to revoke stateless tokens.
+ALTER TABLE "user" ADD COLUMN token_version integer NOT NULL DEFAULT 0;
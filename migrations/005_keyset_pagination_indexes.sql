@@ -0,0 +1,6 @@
+-- (created_at, id) indexes backing keyset pagination on the listing
+-- endpoints; post also gets one per author for /post/self and /post/author.
+CREATE INDEX CONCURRENTLY ix_post_created_at_id ON post (created_at, id);
+CREATE INDEX CONCURRENTLY ix_post_author_id_created_at_id ON post (author_id, created_at, id);
+CREATE INDEX CONCURRENTLY ix_user_created_at_id ON "user" (created_at, id);
+CREATE INDEX CONCURRENTLY ix_role_created_at_id ON role (created_at, id);
@@ -0,0 +1,10 @@
+-- Background poster processing state and the generated variants.
+-- Keep the enum values in sync with PosterStatus in app/models/post_model.py.
+BEGIN;
+
+CREATE TYPE posterstatus AS ENUM ('pending', 'ready', 'failed');
+ALTER TABLE post
+    ADD COLUMN poster_status posterstatus,
+    ADD COLUMN poster_variants jsonb;
+
+COMMIT;
@@ -0,0 +1,21 @@
+-- Durable queue of outgoing emails drained by app.core.mail.MailOutbox.
+-- Keep the enum values in sync with EmailStatus in app/models/email_outbox_model.py.
+BEGIN;
+
+CREATE TYPE emailstatus AS ENUM ('pending', 'sent', 'failed');
+CREATE TABLE email_outbox (
+    email_to varchar NOT NULL,
+    subject varchar NOT NULL,
+    html_content varchar NOT NULL,
+    id uuid NOT NULL PRIMARY KEY,
+    updated_at timestamp without time zone,
+    created_at timestamp without time zone,
+    status emailstatus NOT NULL,
+    attempts integer NOT NULL,
+    next_attempt_at timestamp without time zone NOT NULL,
+    last_error varchar,
+    sent_at timestamp without time zone
+);
+CREATE INDEX ix_email_outbox_status_next_attempt_at ON email_outbox (status, next_attempt_at);
+
+COMMIT;
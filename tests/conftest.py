@@ -0,0 +1,160 @@
+import os
+import socket
+import tempfile
+import uuid
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import Uuid, event
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.dialects.sqlite.aiosqlite import SQLiteDialect_aiosqlite
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Settings are read on import; these stand in for .env so the app modules
+# import without one. Nothing here connects to the configured database.
+for name, value in {
+    "APP_HOST": "localhost",
+    "APP_NAME": "test",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "REFRESH_TOKEN_EXPIRE_MINUTES": "60",
+    "DATABASE_USER": "postgres",
+    "DATABASE_PASSWORD": "postgres",
+    "DATABASE_HOST": "localhost",
+    "DATABASE_PORT": "5432",
+    "DATABASE_NAME": "test",
+    # app.main serves it as a static directory, which must exist.
+    "UPLOAD_PATH": tempfile.mkdtemp(prefix="upload-"),
+    "EMAIL_USERNAME": "test",
+    "EMAIL_PASSWORD": "test",
+    "EMAIL_FROM": "noreply@example.com",
+    "EMAIL_PORT": "25",
+    "EMAIL_SERVER": "localhost",
+    "EMAIL_STARTTLS": "false",
+    "EMAIL_SSL_TLS": "false",
+    "USE_CREDENTIALS": "false",
+    "VALIDATE_CERTS": "false",
+    "EMAIL_RESET_TOKEN_EXPIRE_HOURS": "48",
+    "EMAILS_ENABLED": "false",
+    "EMAILS_FROM_NAME": "test",
+    "FIRST_SUPERUSER_NICKNAME": "admin",
+    "FIRST_SUPERUSER_EMAIL": "admin@example.com",
+    "FIRST_SUPERUSER_PASSWORD": "changethis",
+    "FIRST_SUPERUSER_FNAME": "Admin",
+    "FIRST_SUPERUSER_LNAME": "Admin",
+    "BACKEND_CORS_ORIGINS": '["http://localhost"]',
+    "JWT_ALGORITHM": "HS256",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# The route tests run on SQLite; these stand in for the Postgres-only column
+# types and the functions behind the generated search_vector column.
+@compiles(JSONB, "sqlite")
+def _compile_jsonb(type_, compiler, **kw) -> str:
+    return "JSON"
+
+
+@compiles(TSVECTOR, "sqlite")
+def _compile_tsvector(type_, compiler, **kw) -> str:
+    return "TEXT"
+
+
+class _SQLiteUuid(Uuid):
+    # asyncpg takes ids as strings too, and the app relies on it, e.g. for
+    # session.get(User, token_data.sub).
+    def bind_processor(self, dialect):
+        process = super().bind_processor(dialect)
+        return lambda value: process(uuid.UUID(value) if isinstance(value, str) else value)
+
+
+SQLiteDialect_aiosqlite.colspecs = {**SQLiteDialect_aiosqlite.colspecs, Uuid: _SQLiteUuid}
+
+
+@pytest_asyncio.fixture
+async def database(monkeypatch, tmp_path):
+    """
+    Session factory for a file-backed SQLite database with every table,
+    patched in wherever the app opens sessions on the primary. Each
+    session gets its own connection, as it would with Postgres, and each
+    test starts with empty caches.
+    """
+    from app.api import deps
+    from app.api.routes import posts
+    from app.core import mail, pagination
+    from app.core.cache import cache, create_backend
+    from app.core.instrumentation import install_query_hooks
+    from app.crud import post_crud, user_crud
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    install_query_hooks(engine)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def register_functions(connection, record) -> None:
+        connection.create_function("to_tsvector", 2, lambda config, text: text, deterministic=True)
+        connection.create_function("setweight", 2, lambda vector, weight: vector, deterministic=True)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    for module in (deps, posts, mail, post_crud):
+        monkeypatch.setattr(module, "AsyncSessionLocal", session_factory)
+    for module in (post_crud, user_crud):
+        monkeypatch.setattr(module, "StreamSessionLocal", session_factory)
+    monkeypatch.setattr(deps, "AsyncReadSessionLocal", None)
+    monkeypatch.setattr(cache, "backend", create_backend())
+    pagination._count_cache.clear()
+    yield session_factory
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def user(database):
+    """
+    Active superuser with the "user" role that POST /user/create hands out.
+    """
+    from app.models.role_model import Role
+    from app.models.user_model import User
+
+    async with database() as session:
+        user = User(
+            nickname="author",
+            email="author@example.com",
+            hashed_password="not-a-hash",
+            is_active=True,
+            is_superuser=True,
+        )
+        session.add(user)
+        await session.flush()
+        session.add(Role(name="user", description="User", user_id=user.id))
+        await session.commit()
+    return user
+
+
+@pytest_asyncio.fixture
+async def client(database, user):
+    """
+    API client authenticated as `user`, going through the real dependencies.
+    """
+    from app.api.api import api_router
+    from app.core.security import create_access_token
+
+    app = FastAPI()
+    app.include_router(api_router)
+    headers = {"Authorization": f"Bearer {create_access_token(user.id)}"}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test", headers=headers
+    ) as client:
+        yield client
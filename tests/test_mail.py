@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.mail import MailOutbox, SMTPConnectionPool
+from app.models.email_outbox_model import EmailOutbox, EmailStatus
+
+REJECTED = "rejected@example.com"
+
+
+class Handler:
+    """
+    Records delivered messages, refuses REJECTED and drops the connection
+    instead of replying to the first `drop` messages.
+    """
+
+    def __init__(self, drop: int = 0) -> None:
+        self.drop = drop
+        self.delivered: list[str] = []
+        self.sessions: set[int] = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REJECTED:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.drop:
+            self.drop -= 1
+            server.transport.close()
+            return "421 Closing connection"
+        self.sessions.add(id(session))
+        self.delivered.extend(envelope.rcpt_tos)
+        return "250 Message accepted"
+
+
+@pytest.fixture
+def smtp_server(monkeypatch, free_port):
+    handler = Handler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port)
+    controller.start()
+    monkeypatch.setattr(settings, "EMAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(settings, "EMAIL_PORT", free_port)
+    monkeypatch.setattr(settings, "EMAIL_PASSWORD", "")
+    monkeypatch.setattr(settings, "EMAIL_STARTTLS", False)
+    monkeypatch.setattr(settings, "EMAIL_SSL_TLS", False)
+    yield handler
+    controller.stop()
+
+
+def message(email_to: str) -> EmailMessage:
+    email_message = EmailMessage()
+    email_message["Subject"] = "Test"
+    email_message["From"] = settings.EMAIL_FROM
+    email_message["To"] = email_to
+    email_message.set_content("<p>Test</p>", subtype="html")
+    return email_message
+
+
+async def outbox_rows(session_factory) -> dict[str, EmailOutbox]:
+    async with session_factory() as session:
+        return {row.email_to: row for row in await session.scalars(select(EmailOutbox))}
+
+
+def test_send_batch_reuses_one_connection(smtp_server):
+    pool = SMTPConnectionPool(size=1)
+    recipients = [f"user{number}@example.com" for number in range(3)]
+    assert pool.send_batch([message(email_to) for email_to in recipients]) == [None] * 3
+    assert pool.send_batch([message("user3@example.com")]) == [None]
+    pool.close()
+    assert smtp_server.delivered == recipients + ["user3@example.com"]
+    assert len(smtp_server.sessions) == 1
+
+
+def test_send_batch_reconnects_once_when_dropped(smtp_server):
+    smtp_server.drop = 1
+    pool = SMTPConnectionPool(size=1)
+    assert pool.send_batch([message("a@example.com"), message("b@example.com")]) == [None, None]
+    pool.close()
+    assert smtp_server.delivered == ["a@example.com", "b@example.com"]
+
+
+def test_send_batch_gives_up_after_second_drop(smtp_server):
+    smtp_server.drop = 2
+    pool = SMTPConnectionPool(size=1)
+    errors = pool.send_batch([message("a@example.com"), message("b@example.com")])
+    pool.close()
+    assert "SMTPServerDisconnected" in errors[0]
+    assert errors[1] is None
+    assert smtp_server.delivered == ["b@example.com"]
+
+
+def test_send_batch_reports_rejected_recipient(smtp_server):
+    pool = SMTPConnectionPool(size=1)
+    errors = pool.send_batch([message("a@example.com"), message(REJECTED), message("b@example.com")])
+    pool.close()
+    assert errors[0] is None and errors[2] is None
+    assert "SMTPRecipientsRefused" in errors[1]
+    assert smtp_server.delivered == ["a@example.com", "b@example.com"]
+
+
+def test_send_batch_fails_whole_batch_when_unreachable(monkeypatch, free_port):
+    monkeypatch.setattr(settings, "EMAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(settings, "EMAIL_PORT", free_port)
+    pool = SMTPConnectionPool(size=1)
+    errors = pool.send_batch([message("a@example.com"), message("b@example.com")])
+    assert len(errors) == 2
+    assert all("ConnectionRefusedError" in error for error in errors)
+
+
+@pytest.mark.asyncio
+async def test_process_batch_records_outcomes(smtp_server, database, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    outbox = MailOutbox()
+    for email_to in ("a@example.com", REJECTED, "b@example.com"):
+        await outbox.enqueue(email_to=email_to, subject="Test", html_content="<p>Test</p>")
+
+    assert await outbox.process_batch() == 3
+    rows = await outbox_rows(database)
+    assert rows["a@example.com"].status == EmailStatus.sent
+    assert rows["b@example.com"].status == EmailStatus.sent
+    retry = rows[REJECTED]
+    assert retry.status == EmailStatus.pending
+    assert retry.attempts == 1
+    assert retry.next_attempt_at > datetime.utcnow()
+    assert "SMTPRecipientsRefused" in retry.last_error
+    # Not due again until its backoff has passed.
+    assert await outbox.process_batch() == 0
+
+    async with database() as session:
+        retry = await session.get(EmailOutbox, retry.id)
+        retry.next_attempt_at = datetime.utcnow()
+        session.add(retry)
+        await session.commit()
+    assert await outbox.process_batch() == 1
+    rows = await outbox_rows(database)
+    assert rows[REJECTED].status == EmailStatus.failed
+    assert rows[REJECTED].attempts == 2
+    await outbox.stop()
+
+
+@pytest.mark.asyncio
+async def test_worker_drains_outbox_on_enqueue(smtp_server, database, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_POLL_INTERVAL", 60)
+    outbox = MailOutbox()
+    outbox.start()
+    try:
+        for number in range(3):
+            await outbox.enqueue(
+                email_to=f"user{number}@example.com", subject="Test", html_content="<p>Test</p>"
+            )
+        for _ in range(100):
+            rows = await outbox_rows(database)
+            if all(row.status == EmailStatus.sent for row in rows.values()):
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        await outbox.stop()
+    assert {email_to: row.status for email_to, row in rows.items()} == {
+        f"user{number}@example.com": EmailStatus.sent for number in range(3)
+    }
+    assert sorted(smtp_server.delivered) == [f"user{number}@example.com" for number in range(3)]
+
+
+def test_emails_enabled_parses_false():
+    # The outbox worker only starts when this is set; "false" must not count.
+    from app.core.config import Settings
+
+    assert Settings(EMAILS_ENABLED="false").EMAILS_ENABLED is False
+    assert Settings(EMAILS_ENABLED="true").EMAILS_ENABLED is True
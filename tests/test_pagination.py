@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app.core.pagination import _estimate_rows
+from app.models.post_model import Post
+
+
+@pytest.mark.asyncio
+async def test_estimate_sends_literals_with_colons_as_is(database):
+    statements = []
+    async with database() as session:
+        engine = session.bind.sync_engine
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def record(connection, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        # SQLite has no EXPLAIN (FORMAT JSON); what matters is that the
+        # statement reached the driver without ":b" taken for a parameter.
+        with pytest.raises(OperationalError):
+            await _estimate_rows(session, Post, Post.title == "a :b")
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements[-1].startswith("EXPLAIN (FORMAT JSON) ")
+    assert "'a :b'" in statements[-1]
@@ -0,0 +1,106 @@
+import pytest
+import pytest_asyncio
+
+from app.core.bulk import NDJSON_MEDIA_TYPE, ndjson_line
+from app.core.instrumentation import assert_max_queries
+from app.core.principal_cache import clear_principals
+from app.models.post_model import Post
+from app.models.tag_model import PostTag, Tag
+from benchmarks.query_budgets import BUDGETS
+
+pytestmark = pytest.mark.asyncio
+
+# Full-text search and trigram suggestions need Postgres.
+POSTGRES_ONLY = {"/post/search?q={word}", "/search/suggest?q={prefix}"}
+
+# Maximum statements per write request, authentication included.
+WRITE_BUDGETS = {
+    ("POST", "/post/"): 7,
+    ("PUT", "/post/{id}"): 6,
+    ("DELETE", "/post/{id}"): 4,
+    ("POST", "/post/bulk"): 5,
+    ("PATCH", "/user/me"): 5,
+    ("POST", "/user/create"): 5,
+}
+
+
+@pytest_asyncio.fixture
+async def values(database, user) -> dict[str, str]:
+    """
+    A published, tagged post by `user` to fill the route paths.
+    """
+    post = Post(
+        title="A published post about budgets",
+        description="What the post is about",
+        content="The body of the post",
+        slug="a_published_post_about_budgets",
+        author_id=user.id,
+        poster=None,
+        status=True,
+    )
+    tag = Tag(name="budgets")
+    async with database() as session:
+        session.add_all([post, tag])
+        await session.flush()
+        session.add(PostTag(post_id=post.id, tag_id=tag.id))
+        await session.commit()
+    return {
+        "id": str(post.id),
+        "slug": post.slug,
+        "nickname": user.nickname,
+        "tag": tag.name,
+    }
+
+
+@pytest.mark.parametrize(
+    "route", [route for route in BUDGETS if route not in POSTGRES_ONLY]
+)
+async def test_read_route_budget(client, values, route):
+    clear_principals()
+    with assert_max_queries(BUDGETS[route]):
+        response = await client.get(route.format(**values))
+    assert response.status_code == 200, response.text
+
+
+def write_request(method: str, route: str, values: dict[str, str]) -> dict:
+    path = route.format(**values)
+    if (method, route) == ("POST", "/post/"):
+        return dict(
+            url=path,
+            data={
+                "title": "A new post about budgets",
+                "description": "What the post is about",
+                "tags": "budgets, writes",
+                "content": "The body of the post",
+            },
+            files={"file": ("empty.png", b"", "image/png")},
+        )
+    if (method, route) == ("PUT", "/post/{id}"):
+        return dict(url=path, json={"content": "The edited body of the post", "tags": []})
+    if (method, route) == ("POST", "/post/bulk"):
+        content = "".join(
+            ndjson_line({
+                "title": f"Imported post about budgets {number}",
+                "description": "Imported description",
+                "content": "Imported content",
+                "tags": "budgets, imported",
+            })
+            for number in range(3)
+        )
+        return dict(url=path, content=content, headers={"Content-Type": NDJSON_MEDIA_TYPE})
+    if (method, route) == ("PATCH", "/user/me"):
+        return dict(url=path, json={"first_name": "Ada"})
+    if (method, route) == ("POST", "/user/create"):
+        return dict(
+            url=path,
+            json={"nickname": "reader", "email": "reader@example.com", "password": "password123"},
+        )
+    return dict(url=path)
+
+
+@pytest.mark.parametrize("method, route", list(WRITE_BUDGETS))
+async def test_write_route_budget(client, values, method, route):
+    clear_principals()
+    with assert_max_queries(WRITE_BUDGETS[method, route]):
+        response = await client.request(method, **write_request(method, route, values))
+    assert response.status_code == 200, response.text
@@ -0,0 +1,102 @@
+import pytest
+
+pytestmark = pytest.mark.asyncio
+
+POST_FORM = {
+    "title": "A post about testing",
+    "description": "What the post is about",
+    "tags": "Testing, Python",
+    "content": "The body of the post",
+}
+
+
+async def create_post(client, **form) -> dict:
+    response = await client.post(
+        "/post/",
+        data={**POST_FORM, **form},
+        files={"file": ("empty.png", b"", "image/png")},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_create_user(client):
+    response = await client.post(
+        "/user/create",
+        json={"nickname": "reader", "email": "reader@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["email"] == "reader@example.com"
+    assert response.json()["roles"] == []
+
+
+async def test_update_own_user(client):
+    response = await client.patch("/user/me", json={"first_name": "Ada"})
+    assert response.status_code == 200, response.text
+    assert response.json()["first_name"] == "Ada"
+    assert [role["name"] for role in response.json()["roles"]] == ["user"]
+
+
+async def test_create_post(client):
+    post = await create_post(client)
+    assert post["title"] == POST_FORM["title"]
+    assert post["author"]["nickname"] == "author"
+    assert post["poster_status"] is None
+
+
+async def test_update_post_drops_cached_reads(client):
+    post = await create_post(client)
+    assert (await client.get(f"/post/{post['id']}")).json()["content"] == POST_FORM["content"]
+
+    response = await client.put(
+        f"/post/{post['id']}", json={"content": "The edited body of the post", "tags": []}
+    )
+    assert response.status_code == 200, response.text
+    assert (await client.get(f"/post/{post['id']}")).json()["content"] == "The edited body of the post"
+
+
+async def test_delete_post_drops_cached_reads(client):
+    post = await create_post(client)
+    assert (await client.get(f"/post/{post['id']}")).status_code == 200
+
+    response = await client.delete(f"/post/{post['id']}")
+    assert response.status_code == 200, response.text
+    assert (await client.get(f"/post/{post['id']}")).status_code == 404
+
+
+async def test_update_user_drops_cached_author(client, user):
+    post = await create_post(client)
+    assert (await client.get(f"/post/{post['id']}")).json()["author"]["first_name"] is None
+
+    response = await client.patch("/user/me", json={"first_name": "Ada"})
+    assert response.status_code == 200, response.text
+    assert (await client.get(f"/post/{post['id']}")).json()["author"]["first_name"] == "Ada"
+
+
+async def test_import_posts_in_several_batches(client, monkeypatch):
+    from app.core.bulk import NDJSON_MEDIA_TYPE, ndjson_line
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "BULK_IMPORT_BATCH_SIZE", 2)
+    records = [
+        {
+            "title": f"Imported post number {number}",
+            "description": "Imported description",
+            "content": "Imported content",
+            "tags": "imported, batch",
+        }
+        for number in range(5)
+    ]
+    records.append(records[0])  # duplicate title, in the third batch
+    response = await client.post(
+        "/post/bulk",
+        content="".join(ndjson_line(record) for record in records),
+        headers={"Content-Type": NDJSON_MEDIA_TYPE},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["created"] == 5
+    assert response.json()["skipped"] == 1
+    assert response.json()["errors"] == [{"line": 6, "detail": "This title is already in use."}]
+
+    response = await client.get("/post/self", params={"count": "exact"})
+    assert response.json()["count"] == 5
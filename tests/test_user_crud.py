@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.core.revocation import token_revocations
+from app.crud import user_crud
+from app.schemas.role_schema import RoleCreate
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_new_role_revokes_tokens_after_commit(database, user):
+    async with database() as session:
+        await user_crud.create_user_role(
+            session=session,
+            role_in=RoleCreate(name="editor", description="Editor", user_id=user.id),
+        )
+    assert token_revocations.get(str(user.id)) == user.token_version + 1
+
+
+async def test_failed_commit_keeps_token_version(database, user, monkeypatch):
+    token_revocations.set(user.id, user.token_version)
+    async with database() as session:
+
+        async def commit() -> None:
+            raise OperationalError("COMMIT", None, Exception("connection lost"))
+
+        monkeypatch.setattr(session, "commit", commit)
+        with pytest.raises(OperationalError):
+            await user_crud.create_user_role(
+                session=session,
+                role_in=RoleCreate(name="editor", description="Editor", user_id=user.id),
+            )
+    assert token_revocations.get(str(user.id)) == user.token_version